@@ -0,0 +1,163 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .models import Complaint, ComplaintStat, SentimentStat
+
+OPEN_STATUSES = {"open", "escalated"}
+UPSERT_DIALECTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def _day(complaint: Complaint):
+    return (complaint.created_at or datetime.utcnow()).date()
+
+
+def _upsert(db: Session, model, key: Dict, increments: Dict) -> None:
+    upsert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(model).values(**key, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in increments},
+        )
+        db.execute(stmt)
+        return
+
+    row = db.query(model).filter_by(**key).with_for_update().first()
+    if row is None:
+        db.add(model(**key, **increments))
+    else:
+        for name, value in increments.items():
+            setattr(row, name, getattr(row, name) + value)
+
+
+def _bump(db: Session, day, department: str, status: str, count: int, sla_hours: int) -> None:
+    _upsert(
+        db,
+        ComplaintStat,
+        {"day": day, "department": department, "status": status},
+        {"complaint_count": count, "sla_hours_sum": sla_hours},
+    )
+
+
+def record_complaint(db: Session, complaint: Complaint) -> None:
+    _bump(db, _day(complaint), complaint.department, complaint.status or "open", 1, complaint.sla_hours or 0)
+
+
+def record_status_change(db: Session, complaint: Complaint, old_status: str) -> None:
+    if old_status == complaint.status:
+        return
+    day, sla_hours = _day(complaint), complaint.sla_hours or 0
+    _bump(db, day, complaint.department, old_status, -1, -sla_hours)
+    _bump(db, day, complaint.department, complaint.status, 1, sla_hours)
+
+
+def record_sentiments(db: Session, scored: Iterable[Tuple[date, str]]) -> None:
+    for (day, sentiment), count in Counter(scored).items():
+        _upsert(db, SentimentStat, {"day": day, "sentiment": sentiment}, {"complaint_count": count})
+
+
+def rebuild_stats(db: Session) -> None:
+    day = func.date(Complaint.created_at)
+    grouped = select(
+        day,
+        Complaint.department,
+        Complaint.status,
+        func.count(Complaint.id),
+        func.coalesce(func.sum(Complaint.sla_hours), 0),
+    ).group_by(day, Complaint.department, Complaint.status)
+    db.query(ComplaintStat).delete()
+    db.execute(
+        insert(ComplaintStat).from_select(
+            ["day", "department", "status", "complaint_count", "sla_hours_sum"],
+            grouped,
+        )
+    )
+    db.commit()
+
+
+def rebuild_sentiment_stats(db: Session) -> None:
+    day = func.date(Complaint.created_at)
+    grouped = (
+        select(day, Complaint.sentiment, func.count(Complaint.id))
+        .where(Complaint.sentiment.is_not(None))
+        .group_by(day, Complaint.sentiment)
+    )
+    db.query(SentimentStat).delete()
+    db.execute(insert(SentimentStat).from_select(["day", "sentiment", "complaint_count"], grouped))
+    db.commit()
+
+
+def ensure_stats(db: Session) -> None:
+    counted = db.query(func.coalesce(func.sum(ComplaintStat.complaint_count), 0)).scalar()
+    if counted != db.query(func.count(Complaint.id)).scalar():
+        rebuild_stats(db)
+    scored = db.query(func.coalesce(func.sum(SentimentStat.complaint_count), 0)).scalar()
+    if scored != db.query(func.count(Complaint.id)).filter(Complaint.sentiment.is_not(None)).scalar():
+        rebuild_sentiment_stats(db)
+
+
+def _summarize(status_rows, department_rows) -> Dict:
+    total = sum(count for _, count, _ in status_rows)
+    sla_total = sum(sla for _, _, sla in status_rows)
+    by_status = {status: count for status, count, _ in status_rows}
+    return {
+        "total_complaints": int(total),
+        "open_cases": int(sum(by_status.get(s, 0) for s in OPEN_STATUSES)),
+        "resolved_cases": int(by_status.get("resolved", 0)),
+        "avg_sla_hours": round(float(sla_total) / total, 2) if total else 0.0,
+        "department_distribution": {department: int(count) for department, count in department_rows if count},
+    }
+
+
+def _day_window(query, column, since: Optional[date], until: Optional[date]):
+    if since is not None:
+        query = query.filter(column >= since)
+    if until is not None:
+        query = query.filter(column <= until)
+    return query
+
+
+def _created_window(query, since: Optional[date], until: Optional[date]):
+    if since is not None:
+        query = query.filter(Complaint.created_at >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        query = query.filter(Complaint.created_at < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+    return query
+
+
+def complaint_summary(db: Session, since: Optional[date] = None, until: Optional[date] = None) -> Dict:
+    if db.query(ComplaintStat.id).first() is not None:
+        count, sla = func.sum(ComplaintStat.complaint_count), func.sum(ComplaintStat.sla_hours_sum)
+        status_rows = _day_window(
+            db.query(ComplaintStat.status, count, sla), ComplaintStat.day, since, until
+        ).group_by(ComplaintStat.status)
+        department_rows = _day_window(
+            db.query(ComplaintStat.department, count), ComplaintStat.day, since, until
+        ).group_by(ComplaintStat.department)
+        return _summarize(status_rows.all(), department_rows.all())
+
+    status_rows = _created_window(
+        db.query(Complaint.status, func.count(Complaint.id), func.coalesce(func.sum(Complaint.sla_hours), 0)),
+        since,
+        until,
+    ).group_by(Complaint.status)
+    department_rows = _created_window(
+        db.query(Complaint.department, func.count(Complaint.id)), since, until
+    ).group_by(Complaint.department)
+    return _summarize(status_rows.all(), department_rows.all())
+
+
+def sentiment_distribution(db: Session, since: Optional[date] = None, until: Optional[date] = None) -> Dict[str, int]:
+    summary = {"positive": 0, "neutral": 0, "negative": 0}
+    rows = _day_window(
+        db.query(SentimentStat.sentiment, func.sum(SentimentStat.complaint_count)), SentimentStat.day, since, until
+    ).group_by(SentimentStat.sentiment)
+    for sentiment, count in rows:
+        summary[sentiment] = int(count or 0)
+    return summary
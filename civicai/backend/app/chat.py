@@ -1,66 +1,142 @@
+import base64
+import json
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from .database import get_db
+from .aggregates import record_complaint
+from .auth import require_role
+from .database import SessionLocal, get_db
+from .health import require_ai_state
 from .models import ChatHistory, Complaint
 from .schemas import ChatRequest, ChatResponse
-from .state import get_ai_state
+from .scoring import scorer
+from .write_behind import write_buffer
 
 router = APIRouter(tags=["chat"])
 
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+HISTORY_EXPORT_PAGE = 1000
+HISTORY_COLUMNS = (ChatHistory.id, ChatHistory.query, ChatHistory.response, ChatHistory.confidence, ChatHistory.created_at)
+
+
+def _escalate(db: Session, payload: ChatRequest) -> dict:
+    ticket_id = f"CIV-{uuid.uuid4().hex[:10].upper()}"
+    complaint = Complaint(
+        ticket_id=ticket_id,
+        user_id=payload.user_id,
+        text="Auto-escalated from chat",
+        department="Escalation Desk",
+        status="escalated",
+        sla_hours=48,
+        severity="high",
+    )
+    db.add(complaint)
+    record_complaint(db, complaint)
+    response = {
+        "answer": f"Issue escalated. Ticket ID: {ticket_id}. SLA: 48 hours.",
+        "confidence": 0.99,
+        "department": "Escalation Desk",
+        "expected_resolution_time": "48 hours",
+        "similar_cases": [],
+    }
+    # Complaint, aggregates and the chat log go out in one transaction.
+    db.add(ChatHistory(**_chat_row(payload, response)))
+    db.commit()
+    return response
+
+
+def _chat_row(payload: ChatRequest, response: dict) -> dict:
+    return {
+        "user_id": payload.user_id,
+        "query": payload.message,
+        "response": response["answer"],
+        "confidence": response["confidence"],
+    }
+
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest, db: Session = Depends(get_db)):
-    ai_state = get_ai_state()
+async def chat(payload: ChatRequest, db: Session = Depends(get_db)):
     msg = payload.message.strip()
 
     if msg.upper() == "NOT SOLVED":
-        ticket_id = f"CIV-{uuid.uuid4().hex[:10].upper()}"
-        complaint = Complaint(
-            ticket_id=ticket_id,
-            user_id=payload.user_id,
-            text="Auto-escalated from chat",
-            department="Escalation Desk",
-            status="escalated",
-            sla_hours=48,
-            severity="high",
-        )
-        db.add(complaint)
-        db.commit()
-        response = {
-            "answer": f"Issue escalated. Ticket ID: {ticket_id}. SLA: 48 hours.",
-            "confidence": 0.99,
-            "department": "Escalation Desk",
-            "expected_resolution_time": "48 hours",
-            "similar_cases": [],
-        }
+        response = await run_in_threadpool(_escalate, db, payload)
+        scorer.notify()
     else:
-        response = ai_state.run_inference(msg)
-
-    chat_row = ChatHistory(
-        user_id=payload.user_id,
-        query=payload.message,
-        response=response["answer"],
-        confidence=response["confidence"],
-    )
-    db.add(chat_row)
-    db.commit()
+        filters = {"location": payload.location, "department": payload.department}
+        response = await require_ai_state().run_inference_async(msg, filters)
+        # History is written behind the response; only a full buffer makes the request wait.
+        row = _chat_row(payload, response)
+        if not write_buffer.offer(ChatHistory, row):
+            await run_in_threadpool(write_buffer.put, ChatHistory, row)
 
     return response
 
 
+def _encode_cursor(created_at: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _history_page(db: Session, user_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None):
+    # Keyset pagination on (created_at, id), newest first, served by ix_chat_history_user_created_id.
+    query = db.query(*HISTORY_COLUMNS).filter(ChatHistory.user_id == user_id)
+    if after is not None:
+        query = query.filter(tuple_(ChatHistory.created_at, ChatHistory.id) < tuple_(*after))
+    return query.order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc()).limit(limit).all()
+
+
+def _history_item(row) -> dict:
+    return {"query": row.query, "response": row.response, "confidence": row.confidence, "created_at": row.created_at}
+
+
 @router.get("/history/{user_id}")
-def history(user_id: int, db: Session = Depends(get_db)):
-    rows = db.query(ChatHistory).filter(ChatHistory.user_id == user_id).order_by(ChatHistory.created_at.desc()).all()
-    return [
-        {
-            "query": row.query,
-            "response": row.response,
-            "confidence": row.confidence,
-            "created_at": row.created_at,
-        }
-        for row in rows
-    ]
+def history(
+    user_id: int,
+    response: Response,
+    limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    rows = _history_page(db, user_id, limit + 1, _decode_cursor(cursor) if cursor else None)
+    # The body stays a plain list for existing clients; the next page is advertised in a header.
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [_history_item(row) for row in rows]
+
+
+def _export_history(user_id: int) -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        after = None
+        while True:
+            rows = _history_page(db, user_id, HISTORY_EXPORT_PAGE, after)
+            for row in rows:
+                item = _history_item(row)
+                item["created_at"] = row.created_at.isoformat()
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+            if len(rows) < HISTORY_EXPORT_PAGE:
+                return
+            after = (rows[-1].created_at, rows[-1].id)
+    finally:
+        db.close()
+
+
+@router.get("/history/{user_id}/export", dependencies=[Depends(require_role("admin"))])
+def export_history(user_id: int):
+    return StreamingResponse(_export_history(user_id), media_type="application/x-ndjson")
@@ -1,36 +1,163 @@
+import asyncio
+import os
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from .aggregates import record_complaint, record_status_change
 from .database import get_db
-from .models import Complaint
-from .schemas import ComplaintCreate, ComplaintResponse, ComplaintStatusResponse, FeedbackRequest
-from .state import get_ai_state
+from .duplicates import duplicates
+from .health import require_ai_state
+from .models import Complaint, ComplaintReport, Feedback
+from .schemas import (
+    ComplaintCreate,
+    ComplaintResponse,
+    ComplaintStatusResponse,
+    ComplaintStatusUpdate,
+    FeedbackRequest,
+    ImageComplaintResponse,
+)
+from .scoring import scorer
+from .nlp.vision import decode_image, get_vision_batcher
+from .write_behind import write_buffer
 
 router = APIRouter(tags=["complaints"])
 
+DEFAULT_SOLUTION = "Your complaint has been registered and assigned for verification."
+VISION_MAX_UPLOAD_BYTES = int(os.getenv("VISION_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+VISION_MIN_CONFIDENCE = float(os.getenv("VISION_MIN_CONFIDENCE", "0.3"))
+
+
+def _complaint_record(complaint: Complaint) -> dict:
+    return {
+        "complaint_id": complaint.id,
+        "id": complaint.ticket_id,
+        "text": complaint.text,
+        "department": complaint.department,
+        "solution": complaint.solution or DEFAULT_SOLUTION,
+        "location": complaint.location or "Unknown",
+        "resolution_days": max(1, (complaint.sla_hours or 72) // 24),
+    }
 
-@router.post("/complaint", response_model=ComplaintResponse)
-def create_complaint(payload: ComplaintCreate, db: Session = Depends(get_db)):
-    ai_state = get_ai_state()
-    response = ai_state.run_inference(payload.text)
 
+def _store_complaint(db: Session, payload: ComplaintCreate, department: str) -> dict:
     ticket_id = f"CIV-{uuid.uuid4().hex[:10].upper()}"
     complaint = Complaint(
         ticket_id=ticket_id,
         user_id=payload.user_id,
         text=payload.text,
-        department=response["department"],
+        department=department,
         location=payload.location,
         status="open",
         sla_hours=72,
         severity="medium",
     )
     db.add(complaint)
+    record_complaint(db, complaint)
+    db.commit()
+    return _complaint_record(complaint)
+
+
+def _report_count(db: Session, complaint_id: int) -> int:
+    return 1 + db.query(func.count(ComplaintReport.id)).filter(ComplaintReport.complaint_id == complaint_id).scalar()
+
+
+def _merge_report(
+    db: Session, payload: ComplaintCreate, ticket_id: str, similarity: float
+) -> Optional[ComplaintResponse]:
+    row = db.query(Complaint).filter(Complaint.ticket_id == ticket_id).first()
+    if row is None or row.status == "resolved":
+        duplicates.discard(ticket_id)
+        return None
+    db.add(ComplaintReport(complaint_id=row.id, user_id=payload.user_id, text=payload.text, similarity=similarity))
     db.commit()
+    return ComplaintResponse(
+        ticket_id=row.ticket_id,
+        department=row.department,
+        status=row.status,
+        sla_hours=row.sla_hours,
+        duplicate_of=row.ticket_id,
+        report_count=_report_count(db, row.id),
+    )
+
+
+async def _find_duplicate(db: Session, payload: ComplaintCreate, vector) -> Optional[ComplaintResponse]:
+    # Pick up tickets filed or resolved through other workers before matching against this worker's pools.
+    await run_in_threadpool(duplicates.sync, db)
+    match = duplicates.find(payload.text, payload.location, vector)
+    if match is None:
+        return None
+    return await run_in_threadpool(_merge_report, db, payload, *match)
+
+
+@router.post("/complaint", response_model=ComplaintResponse)
+async def create_complaint(payload: ComplaintCreate, db: Session = Depends(get_db)):
+    ai_state = require_ai_state()
+    filters = {"location": payload.location}
+    response, vector = await ai_state.run_inference_async(payload.text, filters, with_vector=True)
+
+    # A repeat of an open ticket in the same ward is recorded against it; it opens no ticket, is not
+    # indexed and does not count towards hotspots or complaint statistics.
+    merged = await _find_duplicate(db, payload, vector)
+    if merged is not None:
+        return merged
+
+    record = await run_in_threadpool(_store_complaint, db, payload, response["department"])
+    ai_state.ingest(record)
+    duplicates.add(record["id"], payload.text, payload.location, vector)
+    scorer.notify()
+
+    return ComplaintResponse(ticket_id=record["id"], department=response["department"], status="open", sla_hours=72)
+
 
-    return ComplaintResponse(ticket_id=ticket_id, department=response["department"], status="open", sla_hours=72)
+@router.post("/complaint/image", response_model=ImageComplaintResponse)
+async def create_image_complaint(
+    user_id: int = Form(...),
+    image: UploadFile = File(...),
+    text: Optional[str] = Form(None),
+    location: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+):
+    ai_state = require_ai_state()
+    data = await image.read(VISION_MAX_UPLOAD_BYTES + 1)
+    if len(data) > VISION_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    try:
+        decoded = await run_in_threadpool(decode_image, data)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # Concurrent uploads share one CLIP forward pass through the vision batcher.
+    issue, department, confidence = await asyncio.wrap_future(get_vision_batcher().submit(decoded))
+    payload = ComplaintCreate(user_id=user_id, text=text or f"Photo complaint: {issue}", location=location)
+    vector = None
+    if text:
+        response, vector = await ai_state.run_inference_async(text, {"location": location}, with_vector=True)
+        if confidence < VISION_MIN_CONFIDENCE:
+            department = response["department"]
+        # Only reports with a description are matched: a bare CLIP label would merge every pothole in a ward.
+        merged = await _find_duplicate(db, payload, vector)
+        if merged is not None:
+            return ImageComplaintResponse(**merged.model_dump(), detected_issue=issue, confidence=confidence)
+
+    record = await run_in_threadpool(_store_complaint, db, payload, department)
+    ai_state.ingest(record)
+    if vector is not None:
+        duplicates.add(record["id"], payload.text, payload.location, vector)
+    scorer.notify()
+
+    return ImageComplaintResponse(
+        ticket_id=record["id"],
+        department=department,
+        status="open",
+        sla_hours=72,
+        detected_issue=issue,
+        confidence=confidence,
+    )
 
 
 @router.get("/status/{ticket_id}", response_model=ComplaintStatusResponse)
@@ -45,13 +172,44 @@ def status(ticket_id: str, db: Session = Depends(get_db)):
         department=row.department,
         sla_hours=row.sla_hours,
         created_at=row.created_at,
+        report_count=_report_count(db, row.id),
     )
 
 
-@router.post("/feedback")
-def feedback(payload: FeedbackRequest, db: Session = Depends(get_db)):
-    from .models import Feedback
+@router.patch("/status/{ticket_id}", response_model=ComplaintStatusResponse)
+def update_status(ticket_id: str, payload: ComplaintStatusUpdate, db: Session = Depends(get_db)):
+    row = db.query(Complaint).filter(Complaint.ticket_id == ticket_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Ticket not found")
 
-    db.add(Feedback(**payload.model_dump()))
+    # A resolution with a solution is written into the index too; during warmup answer 503 before changing anything.
+    ai_state = require_ai_state() if payload.status == "resolved" and (payload.solution or row.solution) else None
+    old_status = row.status
+    row.status = payload.status
+    if payload.solution:
+        row.solution = payload.solution
+    record_status_change(db, row, old_status)
     db.commit()
+    if row.status == "resolved":
+        duplicates.discard(row.ticket_id)
+
+    if ai_state is not None:
+        if not ai_state.update_record(row.ticket_id, solution=row.solution):
+            ai_state.ingest(_complaint_record(row))
+
+    return ComplaintStatusResponse(
+        ticket_id=row.ticket_id,
+        status=row.status,
+        department=row.department,
+        sla_hours=row.sla_hours,
+        created_at=row.created_at,
+        report_count=_report_count(db, row.id),
+    )
+
+
+@router.post("/feedback")
+async def feedback(payload: FeedbackRequest):
+    row = payload.model_dump()
+    if not write_buffer.offer(Feedback, row):
+        await run_in_threadpool(write_buffer.put, Feedback, row)
     return {"message": "Feedback received"}
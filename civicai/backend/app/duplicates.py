@@ -0,0 +1,209 @@
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Complaint
+from .nlp.embedder import detect_language, embed_queries
+from .nlp.lexical import tokenize
+from .nlp.translate import translate_batch
+
+logger = logging.getLogger(__name__)
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_WINDOW_HOURS = float(os.getenv("DEDUP_WINDOW_HOURS", "72"))
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.92"))
+DEDUP_SCAN_MAX = int(os.getenv("DEDUP_SCAN_MAX", "256"))
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+_PRIME = (1 << 31) - 1
+_EPOCH = datetime(1970, 1, 1)
+# Resolutions are tailed by updated_at, which each worker stamps from its own clock before committing.
+_CLOCK_SLACK = timedelta(seconds=60)
+
+
+class _Open:
+    __slots__ = ("ticket_id", "created", "vector", "bands")
+
+    def __init__(self, ticket_id: str, created: float, vector: np.ndarray, bands: List[bytes]):
+        self.ticket_id = ticket_id
+        self.created = created
+        self.vector = vector
+        self.bands = bands
+
+
+def _location_key(location: Optional[str]) -> Optional[str]:
+    key = (location or "").strip().lower()
+    return None if key in ("", "unknown") else key
+
+
+class DuplicateDetector:
+    """Recent open complaints per location, matched by query-embedding cosine.
+
+    The pools are per process; every worker tails the complaints table (`sync`) for tickets filed and resolved
+    through the others, so a repeat is caught whichever worker handles it. A MinHash/LSH sketch of word uni- and
+    bigrams narrows the candidates once a location holds more than DEDUP_SCAN_MAX open complaints; smaller pools
+    are compared against every entry.
+    """
+
+    def __init__(
+        self,
+        window_hours: float = DEDUP_WINDOW_HOURS,
+        threshold: float = DEDUP_SIMILARITY,
+        scan_max: int = DEDUP_SCAN_MAX,
+    ):
+        self.window_seconds = window_hours * 3600
+        self.threshold = threshold
+        self.scan_max = scan_max
+        rng = np.random.default_rng(7)
+        self._a = rng.integers(1, _PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+        self._pools: Dict[str, Dict[str, _Open]] = defaultdict(dict)
+        self._buckets: Dict[Tuple[str, int, bytes], Set[str]] = defaultdict(set)
+        self._locations: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.last_complaint_id = 0
+        self._resolved_since: Optional[datetime] = None
+        self.counters = {"checked": 0, "duplicates": 0, "compared": 0, "synced": 0}
+
+    def _bands(self, text: str) -> List[bytes]:
+        tokens = tokenize(text)
+        shingles = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+        if not shingles:
+            return []
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) & _PRIME for s in shingles), dtype=np.uint64)
+        signature = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+        return [band.tobytes() for band in np.split(signature.astype(np.uint32), LSH_BANDS)]
+
+    def _remove(self, ticket_id: str) -> None:
+        location = self._locations.pop(ticket_id, None)
+        if location is None:
+            return
+        entry = self._pools[location].pop(ticket_id)
+        for i, band in enumerate(entry.bands):
+            bucket = self._buckets.get((location, i, band))
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[(location, i, band)]
+        if not self._pools[location]:
+            del self._pools[location]
+
+    def _expire(self, location: str, now: float) -> None:
+        pool = self._pools.get(location, {})
+        # Pools are insertion-ordered by creation time, so expired entries sit at the front.
+        while pool:
+            entry = next(iter(pool.values()))
+            if now - entry.created <= self.window_seconds:
+                break
+            self._remove(entry.ticket_id)
+
+    def find(self, text: str, location: Optional[str], vector: np.ndarray, now: Optional[float] = None):
+        """(ticket_id, similarity) of the open complaint this one repeats, or None."""
+        key = _location_key(location)
+        if not DEDUP_ENABLED or key is None:
+            return None
+        now = time.time() if now is None else now
+        bands = self._bands(text)
+        with self._lock:
+            self.counters["checked"] += 1
+            self._expire(key, now)
+            pool = self._pools.get(key)
+            if not pool:
+                return None
+            if len(pool) <= self.scan_max:
+                candidates = list(pool)
+            else:
+                buckets = (self._buckets.get((key, i, band), ()) for i, band in enumerate(bands))
+                candidates = list(set().union(*buckets))
+            if not candidates:
+                return None
+            self.counters["compared"] += len(candidates)
+            vectors = np.stack([pool[ticket_id].vector for ticket_id in candidates])
+            sims = vectors @ np.asarray(vector, dtype="float32")
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            self.counters["duplicates"] += 1
+            return candidates[best], float(sims[best])
+
+    def add(
+        self, ticket_id: str, text: str, location: Optional[str], vector: np.ndarray, created: Optional[float] = None
+    ) -> None:
+        key = _location_key(location)
+        if not DEDUP_ENABLED or key is None:
+            return
+        created = time.time() if created is None else created
+        entry = _Open(ticket_id, created, np.asarray(vector, dtype="float32"), self._bands(text))
+        with self._lock:
+            self._remove(ticket_id)
+            pool = self._pools[key]
+            newest = next(reversed(pool.values()), None)
+            pool[ticket_id] = entry
+            if newest is not None and newest.created > created:
+                # Synced rows can arrive behind newer local ones; _expire relies on creation order.
+                self._pools[key] = dict(sorted(pool.items(), key=lambda item: item[1].created))
+            self._locations[ticket_id] = key
+            for i, band in enumerate(entry.bands):
+                self._buckets[(key, i, band)].add(ticket_id)
+
+    def discard(self, ticket_id: str) -> None:
+        with self._lock:
+            self._remove(ticket_id)
+
+    def sync(self, db: Session) -> None:
+        """Load open complaints committed since the last call and drop those resolved meanwhile, by any worker."""
+        if not DEDUP_ENABLED:
+            return
+        with self._sync_lock:
+            started = datetime.utcnow()
+            latest = db.query(func.max(Complaint.id)).scalar() or 0
+            query = db.query(Complaint.ticket_id, Complaint.text, Complaint.location, Complaint.created_at).filter(
+                Complaint.id > self.last_complaint_id,
+                Complaint.id <= latest,
+                Complaint.status != "resolved",
+                Complaint.location.isnot(None),
+            )
+            if not self.last_complaint_id:
+                # First sync: only complaints still inside the window; from then on only ids not seen yet.
+                query = query.filter(Complaint.created_at >= started - timedelta(seconds=self.window_seconds))
+            rows = [row for row in query.order_by(Complaint.id).all() if _location_key(row.location)]
+            with self._lock:
+                rows = [row for row in rows if row.ticket_id not in self._locations]
+            if rows:
+                # Same text path as run_inference (prepare_query), but one translation batch instead of a call per row.
+                foreign = sorted({row.text for row in rows if detect_language(row.text) != "en"})
+                english = dict(zip(foreign, translate_batch(foreign, "en")))
+                vectors = embed_queries([english.get(row.text, row.text) for row in rows])
+                for row, vector in zip(rows, vectors):
+                    created = (row.created_at - _EPOCH).total_seconds()
+                    self.add(row.ticket_id, row.text, row.location, vector, created=created)
+                self.counters["synced"] += len(rows)
+            if self._resolved_since is not None:
+                resolved = db.query(Complaint.ticket_id).filter(
+                    Complaint.status == "resolved", Complaint.updated_at >= self._resolved_since
+                ).all()
+                with self._lock:
+                    for (ticket_id,) in resolved:
+                        self._remove(ticket_id)
+            self.last_complaint_id = latest
+            self._resolved_since = started - _CLOCK_SLACK
+
+    def warm(self, db: Session) -> None:
+        self.sync(db)
+        logger.info("Loaded %d open complaints into the duplicate detector", len(self._locations))
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "open": len(self._locations), "locations": len(self._pools)}
+
+
+duplicates = DuplicateDetector()
@@ -0,0 +1,129 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from .database import SessionLocal
+from .duplicates import duplicates
+from .nlp.model_client import remote_enabled
+from .nlp.sentiment import get_sentiment_pipeline
+from .nlp.vision import VISION_MODEL, get_zero_shot_vision
+from .state import AIState, ai_state_loaded, get_ai_state
+from .topics import get_topic_model
+
+logger = logging.getLogger(__name__)
+
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+READY_COMPONENTS = ("database", "ai_state")
+STARTED_AT = time.monotonic()
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+def _ping_database() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+
+
+class Warmup:
+    def __init__(self, loaders: Dict[str, Callable]):
+        self.loaders = loaders
+        self.components: Dict[str, Dict] = {name: {"status": "pending"} for name in loaders}
+        self._on_ready: List[Callable[[], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        if on_ready is not None:
+            self._on_ready.append(on_ready)
+        with self._lock:
+            # A finished run is retried only if something failed, e.g. artifacts built after boot.
+            retry = self._thread is not None and not self._thread.is_alive() and not self.all_ready()
+            if self._thread is None or retry:
+                self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        for name, loader in self.loaders.items():
+            if self.ready(name):
+                continue
+            self.components[name] = {"status": "loading"}
+            start = time.perf_counter()
+            try:
+                loader()
+            except Exception as exc:
+                logger.exception("Warmup of %s failed", name)
+                self.components[name] = {"status": "failed", "error": str(exc)}
+                continue
+            self.components[name] = {"status": "ready", "load_seconds": round(time.perf_counter() - start, 3)}
+        callbacks, self._on_ready = self._on_ready, []
+        for callback in callbacks:
+            callback()
+
+    def ready(self, name: str) -> bool:
+        return self.components.get(name, {}).get("status") == "ready"
+
+    def all_ready(self) -> bool:
+        return all(self.ready(name) for name in self.loaders)
+
+    def report(self) -> Dict[str, Dict]:
+        return {name: dict(component) for name, component in self.components.items()}
+
+
+def _load_sentiment() -> None:
+    if not remote_enabled():
+        get_sentiment_pipeline()
+
+
+def _load_vision() -> None:
+    # The classifier falls back to "unclassified" when CLIP is unavailable; report that as a failed component.
+    if not remote_enabled() and get_zero_shot_vision() is None:
+        raise RuntimeError(f"{VISION_MODEL} failed to load; image complaints are unclassified")
+
+
+def _load_duplicates() -> None:
+    db = SessionLocal()
+    try:
+        duplicates.warm(db)
+    finally:
+        db.close()
+
+
+warmup = Warmup(
+    {
+        "database": _ping_database,
+        "ai_state": get_ai_state,
+        "sentiment": _load_sentiment,
+        "topic_model": get_topic_model,
+        "vision": _load_vision,
+        "duplicates": _load_duplicates,
+    }
+)
+
+
+def require_ai_state() -> AIState:
+    if ai_state_loaded():
+        return get_ai_state()
+    warmup.start()
+    raise HTTPException(status_code=503, detail="Models are warming up", headers={"Retry-After": "5"})
+
+
+@router.get("/live")
+def live():
+    return {"status": "ok", "uptime_seconds": round(time.monotonic() - STARTED_AT, 3)}
+
+
+@router.get("/ready")
+def ready():
+    components = warmup.report()
+    is_ready = all(warmup.ready(name) for name in READY_COMPONENTS)
+    body = {"status": "ready" if is_ready else "starting", "components": components}
+    return JSONResponse(body, status_code=200 if is_ready else 503)
@@ -0,0 +1,127 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Complaint
+
+HOTSPOT_BUCKET_SECONDS = int(os.getenv("HOTSPOT_BUCKET_SECONDS", "3600"))
+HOTSPOT_HISTORY_DAYS = int(os.getenv("HOTSPOT_HISTORY_DAYS", "14"))
+WINDOW_PATTERN = re.compile(r"^(\d+)([hd])$")
+
+
+def parse_window(window: str) -> int:
+    match = WINDOW_PATTERN.match(window)
+    if not match:
+        raise ValueError(f"Invalid window {window!r}; use e.g. 1h, 24h or 7d")
+    seconds = int(match.group(1)) * (3600 if match.group(2) == "h" else 86400)
+    return max(1, seconds // HOTSPOT_BUCKET_SECONDS)
+
+
+class HotspotCounter:
+    """Per-process ring of time buckets fed from the complaints table.
+
+    Every worker tails the same table by id (`sync`), so all of them count the same complaints whichever one
+    committed them; /alerts does one indexed range query over rows it has not seen yet.
+    """
+
+    def __init__(self, bucket_seconds: int = HOTSPOT_BUCKET_SECONDS, history_days: int = HOTSPOT_HISTORY_DAYS):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = max(1, history_days * 86400 // bucket_seconds)
+        self._counts: Dict[Tuple[str, str], np.ndarray] = {}
+        self._stamps: Dict[Tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.last_complaint_id = 0
+
+    def _bucket(self, ts: Optional[float]) -> int:
+        return int((time.time() if ts is None else ts) // self.bucket_seconds)
+
+    def add(self, department: str, location: Optional[str], ts: Optional[float] = None, count: int = 1) -> None:
+        key = (department, location or "Unknown")
+        bucket = self._bucket(ts)
+        slot = bucket % self.n_buckets
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = np.zeros(self.n_buckets, dtype=np.int32)
+                self._stamps[key] = np.full(self.n_buckets, -1, dtype=np.int64)
+            stamps = self._stamps[key]
+            if stamps[slot] != bucket:
+                if bucket < stamps[slot]:
+                    return
+                stamps[slot] = bucket
+                counts[slot] = 0
+            counts[slot] += count
+
+    def sync(self, db: Session) -> None:
+        with self._sync_lock:
+            query = db.query(Complaint.id, Complaint.department, Complaint.location, Complaint.created_at)
+            if self.last_complaint_id:
+                query = query.filter(Complaint.id > self.last_complaint_id)
+            else:
+                # First sync: only the retained history, by time; from then on only ids not seen yet.
+                cutoff = datetime.utcnow() - timedelta(seconds=self.n_buckets * self.bucket_seconds)
+                query = query.filter(Complaint.created_at >= cutoff)
+                self.last_complaint_id = db.query(func.max(Complaint.id)).scalar() or 0
+                query = query.filter(Complaint.id <= self.last_complaint_id)
+            epoch = datetime(1970, 1, 1)
+            for complaint_id, department, location, created_at in query.order_by(Complaint.id).yield_per(1000):
+                self.add(department, location, ts=(created_at - epoch).total_seconds())
+                self.last_complaint_id = max(self.last_complaint_id, complaint_id)
+
+    def warm(self, db: Session) -> None:
+        self.sync(db)
+
+    def window_counts(self, window_buckets: int, now: Optional[float] = None) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        current_bucket = self._bucket(now)
+        window_buckets = min(window_buckets, self.n_buckets // 2 or 1)
+        start, previous_start = current_bucket - window_buckets, current_bucket - 2 * window_buckets
+        result = {}
+        with self._lock:
+            for key in list(self._counts):
+                counts, stamps = self._counts[key], self._stamps[key]
+                if stamps.max() <= current_bucket - self.n_buckets:
+                    del self._counts[key], self._stamps[key]
+                    continue
+                current = int(counts[(stamps > start) & (stamps <= current_bucket)].sum())
+                previous = int(counts[(stamps > previous_start) & (stamps <= start)].sum())
+                if current or previous:
+                    result[key] = (current, previous)
+        return result
+
+    def alerts(
+        self,
+        window: str = "7d",
+        min_count: int = 3,
+        high_count: int = 7,
+        min_growth: Optional[float] = None,
+    ) -> List[Dict]:
+        alerts = []
+        for (department, location), (current, previous) in self.window_counts(parse_window(window)).items():
+            if current < min_count:
+                continue
+            growth = round(current / previous, 2) if previous else None
+            if min_growth is not None and growth is not None and growth < min_growth:
+                continue
+            alerts.append(
+                {
+                    "department": department,
+                    "location": location,
+                    "issue_count": current,
+                    "severity": "high" if current >= high_count else "medium",
+                    "previous_count": previous,
+                    "growth": growth,
+                }
+            )
+        alerts.sort(key=lambda alert: alert["issue_count"], reverse=True)
+        return alerts
+
+
+hotspots = HotspotCounter()
@@ -1,16 +1,28 @@
-from fastapi import FastAPI
+import os
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
 
+from .aggregates import ensure_stats
 from .analytics import router as analytics_router
-from .auth import get_password_hash, router as auth_router
+from .auth import get_current_claims, get_password_hash, router as auth_router
 from .chat import router as chat_router
 from .complaints import router as complaints_router
-from .database import Base, SessionLocal, engine
+from .database import Base, SessionLocal, engine, ensure_columns, ensure_indexes
+from .duplicates import duplicates
+from .health import MODEL_WARMUP, require_ai_state, router as health_router, warmup
+from .hotspots import hotspots
 from .models import User
-from .state import get_ai_state
+from .nlp.translate import get_cache as get_translation_cache
+from .scoring import scorer
+from .state import shutdown_ai_state
+from .topics import topic_updater
+from .write_behind import write_buffer
+
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "0") == "1"
 
 limiter = Limiter(key_func=get_remote_address)
 app = FastAPI(title="CivicAI API", version="1.0.0", description="AI-powered grievance and policy intelligence platform")
@@ -22,27 +34,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+protected = [Depends(get_current_claims)] if AUTH_REQUIRED else []
 app.include_router(auth_router)
-app.include_router(chat_router)
-app.include_router(complaints_router)
-app.include_router(analytics_router)
+app.include_router(chat_router, dependencies=protected)
+app.include_router(complaints_router, dependencies=protected)
+app.include_router(analytics_router, dependencies=protected)
+app.include_router(health_router)
 
 
 @app.on_event("startup")
 def startup():
     Base.metadata.create_all(bind=engine)
-    get_ai_state()
+    ensure_columns()
+    ensure_indexes()
+    write_buffer.start()
     db: Session = SessionLocal()
     try:
         if not db.query(User).filter(User.username == "admin").first():
             db.add(User(username="admin", email="admin@civicai.local", hashed_password=get_password_hash("admin123"), role="admin"))
             db.commit()
+        ensure_stats(db)
+        hotspots.warm(db)
     finally:
         db.close()
+    # Models load in the background so the socket opens immediately; /health/ready reports progress.
+    if MODEL_WARMUP:
+        warmup.start(on_ready=start_background)
+    else:
+        start_background()
+
+
+def start_background() -> None:
+    scorer.start()
+    topic_updater.start()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    scorer.stop()
+    topic_updater.stop()
+    write_buffer.stop()
+    shutdown_ai_state()
 
 
 @app.get("/")
 def health_check():
     return {"status": "ok", "service": "CivicAI"}
+
+
+@app.get("/stats/writes")
+def write_stats():
+    return write_buffer.stats()
+
+
+@app.get("/stats/duplicates")
+def duplicate_stats():
+    return duplicates.stats()
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    return {**require_ai_state().stats(), "translation_cache": get_translation_cache().stats()}
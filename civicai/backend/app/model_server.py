@@ -0,0 +1,119 @@
+import logging
+import os
+import signal
+import threading
+from multiprocessing.connection import Connection, Listener
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .nlp.batching import MicroBatcher
+from .nlp.embedder import embed_documents, embed_queries
+from .nlp.model_client import MODEL_SERVER_AUTHKEY, MODEL_SERVER_SOCKET, serve_locally
+from .nlp.sentiment import classify_sentiments, get_sentiment_pipeline
+from .nlp.vision import classify_images, get_zero_shot_vision
+from .state import get_ai_state, shutdown_ai_state
+
+logger = logging.getLogger(__name__)
+
+MODEL_SERVER_MAX_BATCH_SIZE = int(os.getenv("MODEL_SERVER_MAX_BATCH_SIZE", "16"))
+MODEL_SERVER_MAX_WAIT_MS = float(os.getenv("MODEL_SERVER_MAX_WAIT_MS", "5"))
+
+
+def _merged(handler: Callable, name: str) -> MicroBatcher:
+    # Workers send whole lists; coalesce concurrent lists into one model call and split the result back.
+    def run(batches: List[List[str]]):
+        sizes = [len(batch) for batch in batches]
+        output = handler([text for batch in batches for text in batch])
+        bounds = np.cumsum([0] + sizes)
+        return [output[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    return MicroBatcher(run, max_batch_size=MODEL_SERVER_MAX_BATCH_SIZE, max_wait_ms=MODEL_SERVER_MAX_WAIT_MS, name=name)
+
+
+class ModelServer:
+    def __init__(self, address: str = MODEL_SERVER_SOCKET, authkey: bytes = MODEL_SERVER_AUTHKEY):
+        self.address = address
+        self.authkey = authkey
+        self._closing = threading.Event()
+        self._listener = None
+        self.batchers = {
+            "embed_documents": _merged(embed_documents, "server-embed-documents"),
+            "embed_queries": _merged(embed_queries, "server-embed-queries"),
+            "classify_sentiments": _merged(classify_sentiments, "server-sentiment"),
+            "classify_images": _merged(classify_images, "server-vision"),
+        }
+        state = get_ai_state()
+        get_sentiment_pipeline()
+        get_zero_shot_vision()
+        self.handlers: Dict[str, Callable] = {
+            "ping": lambda: "pong",
+            "run_inference": state.run_inference,
+            "ingest": lambda record: state.ingest(record).result(),
+            "update_record": state.update_record,
+            "stats": lambda: {**state.stats(), **{name: b.stats() for name, b in self.batchers.items()}},
+            "embed_documents": self.batchers["embed_documents"],
+            "embed_queries": self.batchers["embed_queries"],
+            "classify_sentiments": lambda texts, batch_size=None: self.batchers["classify_sentiments"](texts),
+            "classify_images": self.batchers["classify_images"],
+        }
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        logger.info("Model server listening on %s", self.address)
+        while not self._closing.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closing.is_set():
+                    break
+                logger.exception("Rejected model client connection")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), name="model-server-conn", daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    method, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                handler = self.handlers.get(method)
+                try:
+                    if handler is None:
+                        raise ValueError(f"Unknown model server method {method!r}")
+                    reply = ("ok", handler(*args, **kwargs))
+                except Exception as exc:
+                    logger.exception("Model server call %s failed", method)
+                    reply = ("error", f"{type(exc).__name__}: {exc}")
+                conn.send(reply)
+
+    def close(self) -> None:
+        self._closing.set()
+        if self._listener is not None:
+            self._listener.close()
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    if not MODEL_SERVER_SOCKET:
+        raise SystemExit("Set MODEL_SERVER_SOCKET to the Unix socket path the API workers will use.")
+    serve_locally()
+    server = ModelServer()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: server.close())
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+        shutdown_ai_state()
+        if os.path.exists(MODEL_SERVER_SOCKET):
+            os.unlink(MODEL_SERVER_SOCKET)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -21,6 +21,7 @@ class User(Base):
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    __table_args__ = (Index("ix_complaints_created_department_location", "created_at", "department", "location"),)
 
     id = Column(Integer, primary_key=True, index=True)
     ticket_id = Column(String(40), unique=True, index=True, nullable=False)
@@ -31,14 +32,50 @@ class Complaint(Base):
     status = Column(String(20), default="open")
     sla_hours = Column(Integer, default=72)
     severity = Column(String(20), default="medium")
+    solution = Column(Text, nullable=True)
+    sentiment = Column(String(10), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     user = relationship("User", back_populates="complaints")
 
 
+class ComplaintEmbedding(Base):
+    __tablename__ = "complaint_embeddings"
+
+    complaint_id = Column(Integer, ForeignKey("complaints.id"), primary_key=True)
+    vector = Column(LargeBinary, nullable=False)
+
+
+class ComplaintReport(Base):
+    """A repeat filing merged into an existing open complaint instead of opening a new ticket."""
+
+    __tablename__ = "complaint_reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    text = Column(Text, nullable=False)
+    similarity = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TopicState(Base):
+    """Single-row topic model shared by all workers; `version` guards concurrent updates."""
+
+    __tablename__ = "topic_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    last_complaint_id = Column(Integer, nullable=False, default=0)
+    topics = Column(Text, nullable=False)
+    model = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (Index("ix_chat_history_user_created_id", "user_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -59,3 +96,25 @@ class Feedback(Base):
     rating = Column(Integer, nullable=False)
     comments = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ComplaintStat(Base):
+    __tablename__ = "complaint_stats"
+    __table_args__ = (UniqueConstraint("day", "department", "status", name="uq_complaint_stats_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    department = Column(String(80), nullable=False)
+    status = Column(String(20), nullable=False)
+    complaint_count = Column(Integer, nullable=False, default=0)
+    sla_hours_sum = Column(Integer, nullable=False, default=0)
+
+
+class SentimentStat(Base):
+    __tablename__ = "sentiment_stats"
+    __table_args__ = (UniqueConstraint("day", "sentiment", name="uq_sentiment_stats_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    sentiment = Column(String(10), nullable=False)
+    complaint_count = Column(Integer, nullable=False, default=0)
@@ -1,16 +1,104 @@
+import hashlib
+import os
+import re
+import unicodedata
 from functools import lru_cache
-from typing import List
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
 import numpy as np
 from langdetect import detect
-from sentence_transformers import SentenceTransformer
+
+from .embedding_store import EmbeddingStore
+from .model_client import get_model_client, remote_enabled
 
 SUPPORTED_LANGS = {"hi", "kn", "ta", "te", "mr", "bn", "en"}
 
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "intfloat/e5-base-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", Path(__file__).resolve().parents[2] / "data" / "models"))
+EMBEDDING_STORE = os.getenv("EMBEDDING_STORE", "1") == "1"
+EMBEDDING_STORE_DIR = Path(
+    os.getenv("EMBEDDING_STORE_DIR", Path(os.getenv("DATA_DIR", Path(__file__).resolve().parents[2] / "data")) / "embeddings")
+)
+EMBEDDING_STORE_MEMORY_SIZE = int(os.getenv("EMBEDDING_STORE_MEMORY_SIZE", "4096"))
+
+
+def _load_torch(model_name: str):
+    # Imported here so torch/sentence-transformers load during warmup, not at app import.
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _load_torch_int8(model_name: str):
+    import torch
+
+    model = _load_torch(model_name)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_name: str):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device="cpu", backend="onnx")
+
+
+def _load_onnx_int8(model_name: str):
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    # The quantized graph is exported once next to a local copy of the model and reused afterwards.
+    local_dir = EMBEDDING_CACHE_DIR / re.sub(r"[^\w.-]+", "__", model_name)
+    # Explicit suffix: the default depends on the config's weight dtype (avx2 writes model_quint8_avx2.onnx).
+    file_suffix = f"int8_{EMBEDDING_ONNX_QUANTIZATION}"
+    file_name = f"onnx/model_{file_suffix}.onnx"
+    if not (local_dir / file_name).exists():
+        model = _load_onnx(model_name)
+        model.save(str(local_dir))
+        export_dynamic_quantized_onnx_model(model, EMBEDDING_ONNX_QUANTIZATION, str(local_dir), file_suffix=file_suffix)
+    return SentenceTransformer(str(local_dir), device="cpu", backend="onnx", model_kwargs={"file_name": file_name})
+
+
+BACKENDS: Dict[str, Callable[[str], object]] = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+    "onnx": _load_onnx,
+    "onnx-int8": _load_onnx_int8,
+}
+
+
+def load_embedder(backend: str = EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[backend](model_name)
+
 
 @lru_cache(maxsize=1)
-def get_embedder() -> SentenceTransformer:
-    return SentenceTransformer("intfloat/e5-base-v2")
+def get_embedder():
+    return load_embedder()
+
+
+def embedding_signature() -> Dict[str, str]:
+    return {"model": EMBEDDING_MODEL, "backend": EMBEDDING_BACKEND}
+
+
+@lru_cache(maxsize=1)
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    if not EMBEDDING_STORE:
+        return None
+    name = re.sub(r"[^\w.-]+", "__", f"{EMBEDDING_MODEL}__{EMBEDDING_BACKEND}")
+    return EmbeddingStore(EMBEDDING_STORE_DIR / name, memory_size=EMBEDDING_STORE_MEMORY_SIZE)
+
+
+def _normalize_text(text: str) -> str:
+    # Only differences the tokenizer cannot see are folded, so a cached vector equals a fresh one.
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_key(text: str, prefix: str) -> bytes:
+    signature = f"{EMBEDDING_MODEL}\x1f{EMBEDDING_BACKEND}\x1f{prefix}\x1f{_normalize_text(text)}"
+    return hashlib.sha1(signature.encode("utf-8")).digest()
 
 
 def _format_e5(texts: List[str], prefix: str) -> List[str]:
@@ -25,13 +113,45 @@ def detect_language(text: str) -> str:
         return "en"
 
 
-def embed_documents(texts: List[str]) -> np.ndarray:
-    model = get_embedder()
-    vectors = model.encode(_format_e5(texts, "passage"), normalize_embeddings=True)
+def encode(model, texts: List[str], prefix: str) -> np.ndarray:
+    vectors = model.encode(_format_e5(texts, prefix), normalize_embeddings=True)
     return np.array(vectors, dtype="float32")
 
 
+def encode_cached(texts: List[str], prefix: str, persist: bool = True) -> np.ndarray:
+    """Encode through the content-addressed store: each distinct text reaches the model at most once.
+
+    persist=False keeps the vectors in the in-memory tier only; used for queries, whose texts are arbitrary user
+    input and would otherwise grow the on-disk store without bound.
+    """
+    store = get_embedding_store()
+    if store is None or not texts:
+        return encode(get_embedder(), texts, prefix)
+    keys = [embedding_key(text, prefix) for text in texts]
+    found = store.get_many(keys, disk=persist)
+    missing: Dict[bytes, str] = {}
+    for key, text, vector in zip(keys, texts, found):
+        if vector is None:
+            missing.setdefault(key, text)
+    if missing:
+        fresh = encode(get_embedder(), list(missing.values()), prefix)
+        store.put_many(list(missing), fresh, persist=persist)
+        computed = dict(zip(missing, fresh))
+        found = [vector if vector is not None else computed[key] for key, vector in zip(keys, found)]
+    return np.stack(found).astype("float32", copy=False)
+
+
+def embed_documents(texts: List[str]) -> np.ndarray:
+    if remote_enabled():
+        return get_model_client().call("embed_documents", list(texts))
+    return encode_cached(list(texts), "passage")
+
+
+def embed_queries(queries: List[str]) -> np.ndarray:
+    if remote_enabled():
+        return get_model_client().call("embed_queries", list(queries))
+    return encode_cached(list(queries), "query", persist=False)
+
+
 def embed_query(query: str) -> np.ndarray:
-    model = get_embedder()
-    vector = model.encode(_format_e5([query], "query"), normalize_embeddings=True)[0]
-    return np.array(vector, dtype="float32")
+    return embed_queries([query])[0]
@@ -0,0 +1,124 @@
+import fcntl
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+KEY_BYTES = 20
+
+
+class EmbeddingStore:
+    """Content-addressed vectors: an append-only memory-mapped file of (key, vector) rows plus an in-memory LRU.
+
+    Several processes may share one directory; appends take an exclusive file lock and readers pick up
+    rows written by others on their next miss. Entries put with ``persist=False`` live in the LRU only.
+    """
+
+    def __init__(self, path: Path, memory_size: int = 4096):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.file = self.path / "vectors.bin"
+        self.meta_file = self.path / "meta.json"
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._rows: Dict[bytes, int] = {}
+        self._map: Optional[np.ndarray] = None
+        self._count = 0
+        self._dim: Optional[int] = None
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0}
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _dtype(self) -> np.dtype:
+        return np.dtype([("key", "u1", (KEY_BYTES,)), ("vector", "<f4", (self._dim,))])
+
+    def _refresh(self) -> None:
+        if self._dim is None and self.meta_file.exists():
+            self._dim = json.loads(self.meta_file.read_text())["dim"]
+        if self._dim is None or not self.file.exists():
+            return
+        count = self.file.stat().st_size // self._dtype().itemsize
+        if count <= self._count:
+            return
+        self._map = np.memmap(self.file, dtype=self._dtype(), mode="r", shape=(count,))
+        for row, key in enumerate(self._map["key"][self._count : count], start=self._count):
+            self._rows[key.tobytes()] = row
+        self._count = count
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        if not self.memory_size:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Sequence[bytes], disk: bool = True) -> List[Optional[np.ndarray]]:
+        found: List[Optional[np.ndarray]] = []
+        with self._lock:
+            refreshed = not disk
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    found.append(vector)
+                    continue
+                row = self._rows.get(key) if disk else None
+                if row is None and not refreshed:
+                    self._refresh()
+                    refreshed = True
+                    row = self._rows.get(key)
+                if row is None:
+                    self.counters["misses"] += 1
+                    found.append(None)
+                    continue
+                vector = np.array(self._map["vector"][row])
+                self._remember(key, vector)
+                self.counters["disk_hits"] += 1
+                found.append(vector)
+        return found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray, persist: bool = True) -> None:
+        vectors = np.asarray(vectors, dtype="float32")
+        if not len(keys):
+            return
+        with self._lock:
+            if not persist:
+                for key, vector in zip(keys, vectors):
+                    self._remember(key, vector)
+                return
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                tmp_path = self.meta_file.with_name(self.meta_file.name + ".tmp")
+                tmp_path.write_text(json.dumps({"dim": self._dim}))
+                os.replace(tmp_path, self.meta_file)
+            rows = np.zeros(len(keys), dtype=self._dtype())
+            rows["key"] = np.frombuffer(b"".join(keys), dtype="u1").reshape(-1, KEY_BYTES)
+            rows["vector"] = vectors
+            with open(self.file, "ab") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    # Drop a torn row left by a writer that died mid-append so rows stay aligned.
+                    size = os.fstat(handle.fileno()).st_size
+                    if size % rows.itemsize:
+                        handle.truncate(size - size % rows.itemsize)
+                    handle.write(rows.tobytes())
+                    handle.flush()
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            self.counters["stored"] += len(keys)
+            self._refresh()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "entries": len(self._rows), "memory_entries": len(self._memory)}
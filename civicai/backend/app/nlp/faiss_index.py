@@ -1,22 +1,61 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 import faiss
 import numpy as np
-import pandas as pd
 
-from .embedder import embed_documents
+from .embedder import EMBEDDING_BACKEND, EMBEDDING_MODEL, embed_documents, embedding_signature
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .record_store import RecordStore, convert_json
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 BASE_DIR = Path(__file__).resolve().parents[2]
-DATA_FILE = BASE_DIR / "data" / "bbmp_reddit_data.csv"
-INDEX_FILE = BASE_DIR / "data" / "grievance.index"
-META_FILE = BASE_DIR / "data" / "grievance_meta.json"
+DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data"))
+DATA_FILE = Path(os.getenv("DATA_FILE", DATA_DIR / "bbmp_reddit_data.csv"))
+FLAT_INDEX_FILE = DATA_DIR / "grievance.index"
+META_FILE = DATA_DIR / "grievance_meta.json"
+STORE_DIR = DATA_DIR / "grievance_store"
+VECTORS_FILE = DATA_DIR / "grievance_vectors.npy"
+EMBEDDING_META_FILE = DATA_DIR / "grievance_embedding.json"
+PARITY_FILE = DATA_DIR / "embedding_parity.json"
+DEFAULT_SOLUTION = "Your complaint has been registered and assigned for verification."
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat")
+INDEX_NLIST = int(os.getenv("INDEX_NLIST", "0"))
+INDEX_NPROBE = int(os.getenv("INDEX_NPROBE", "16"))
+INDEX_HNSW_M = int(os.getenv("INDEX_HNSW_M", "32"))
+INDEX_EF_CONSTRUCTION = int(os.getenv("INDEX_EF_CONSTRUCTION", "200"))
+INDEX_EF_SEARCH = int(os.getenv("INDEX_EF_SEARCH", "64"))
+INDEX_PQ_M = int(os.getenv("INDEX_PQ_M", "64"))
+MIN_TRAINING_VECTORS = 1024
+
+RETRIEVAL_MODES = ("dense", "hybrid")
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "50"))
+FILTER_FIELDS = ("department", "location")
+PARTITION_MIN_SIZE = int(os.getenv("PARTITION_MIN_SIZE", "20"))
+PARTITION_MAX_SIZE = int(os.getenv("PARTITION_MAX_SIZE", "50000"))
+PARTITION_CACHE_SIZE = int(os.getenv("PARTITION_CACHE_SIZE", "256"))
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EVERY = int(os.getenv("INDEX_CHECKPOINT_EVERY", "50"))
+CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("INDEX_CHECKPOINT_INTERVAL_SECONDS", "300"))
+SYNC_INTERVAL_SECONDS = float(os.getenv("INDEX_SYNC_INTERVAL_SECONDS", "10"))
 
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df = df.rename(columns={c: c.lower() for c in df.columns})
     for needed in ["text", "department", "solution", "location"]:
         if needed not in df.columns:
@@ -25,44 +64,460 @@ def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _build_index(records: List[Dict]) -> faiss.IndexFlatIP:
-    vectors = embed_documents([row["text"] for row in records])
-    dim = vectors.shape[1]
-    index = faiss.IndexFlatIP(dim)
+def frame_records(df: pd.DataFrame) -> List[Dict]:
+    import pandas as pd
+
+    df = normalize_columns(df.fillna(""))
+    text = df["text"].astype(str)
+    df = df[text.str.strip() != ""]
+    days = df["resolution_days"] if "resolution_days" in df.columns else pd.Series(5, index=df.index)
+    days = pd.to_numeric(days, errors="coerce").fillna(0).astype(int).where(lambda d: d > 0, 5)
+    return [
+        {
+            "id": record_id,
+            "text": text_value,
+            "department": department or "General Administration",
+            "solution": solution or DEFAULT_SOLUTION,
+            "location": location or "Unknown",
+            "resolution_days": int(resolution_days),
+        }
+        for record_id, text_value, department, solution, location, resolution_days in zip(
+            df["id"],
+            df["text"].astype(str),
+            df["department"].astype(str),
+            df["solution"].astype(str),
+            df["location"].astype(str),
+            days,
+        )
+    ]
+
+
+def index_file_for(index_type: str) -> Path:
+    if index_type == "flat":
+        return FLAT_INDEX_FILE
+    return FLAT_INDEX_FILE.with_name(f"grievance.{index_type}.index")
+
+
+INDEX_FILE = index_file_for(INDEX_TYPE)
+
+
+def _auto_nlist(n_vectors: int) -> int:
+    return int(max(1, min(4 * np.sqrt(n_vectors), n_vectors // 39)))
+
+
+def create_index(
+    vectors: np.ndarray,
+    index_type: str = INDEX_TYPE,
+    nlist: int = INDEX_NLIST,
+    hnsw_m: int = INDEX_HNSW_M,
+    pq_m: int = INDEX_PQ_M,
+) -> faiss.Index:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown INDEX_TYPE {index_type!r}; expected one of {', '.join(INDEX_TYPES)}")
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n_vectors, dim = vectors.shape
+    if index_type.startswith("ivf") and n_vectors < MIN_TRAINING_VECTORS:
+        logger.warning("Only %d vectors, too few to train %s; using flat index", n_vectors, index_type)
+        index_type = "flat"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = INDEX_EF_CONSTRUCTION
+    else:
+        quantizer = faiss.IndexFlatIP(dim)
+        nlist = nlist or _auto_nlist(n_vectors)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+
     index.add(vectors)
-    faiss.write_index(index, str(INDEX_FILE))
-    META_FILE.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    configure_search(index)
     return index
 
 
-def load_or_create_index() -> Tuple[faiss.Index, List[Dict]]:
-    if not DATA_FILE.exists():
-        raise FileNotFoundError(f"Dataset missing at {DATA_FILE}")
+def configure_search(index: faiss.Index, nprobe: int = INDEX_NPROBE, ef_search: int = INDEX_EF_SEARCH) -> faiss.Index:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    return index
 
-    if INDEX_FILE.exists() and META_FILE.exists():
-        index = faiss.read_index(str(INDEX_FILE))
-        records = json.loads(META_FILE.read_text(encoding="utf-8"))
-        return index, records
 
-    df = _normalize_columns(pd.read_csv(DATA_FILE).fillna(""))
-    records = [
-        {
-            "id": row["id"],
-            "text": str(row["text"]),
-            "department": str(row["department"] or "General Administration"),
-            "solution": str(row["solution"] or "Your complaint has been registered and assigned for verification."),
-            "location": str(row["location"] or "Unknown"),
-            "resolution_days": int(row.get("resolution_days", 5) or 5),
-        }
-        for _, row in df.iterrows()
-        if str(row["text"]).strip()
-    ]
+def search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None, sel=None):
+    extra = {"sel": sel} if sel is not None else {}
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and (nprobe is not None or extra):
+        return faiss.SearchParametersIVF(nprobe=nprobe or ivf.nprobe, **extra)
+    if isinstance(index, faiss.IndexHNSW) and (ef_search is not None or extra):
+        return faiss.SearchParametersHNSW(efSearch=ef_search or index.hnsw.efSearch, **extra)
+    return faiss.SearchParameters(**extra) if extra else None
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    # Per-process temp name: workers checkpoint the same shared file.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_index(index: faiss.Index, path: Path = INDEX_FILE) -> None:
+    _atomic_write(path, faiss.serialize_index(index).tobytes())
+
+
+def _catch_up(index: faiss.Index, records: RecordStore) -> bool:
+    # The record store commits before the index checkpoint, so after a crash it can
+    # hold rows the index has not seen yet; embed just those instead of rebuilding.
+    if len(records) <= index.ntotal:
+        return False
+    missing = [records[pos]["text"] for pos in range(index.ntotal, len(records))]
+    index.add(embed_documents(missing))
+    return True
+
+
+def _open_records() -> Optional[RecordStore]:
+    if RecordStore.exists(STORE_DIR):
+        return RecordStore(STORE_DIR)
+    if META_FILE.exists():
+        return convert_json(META_FILE, STORE_DIR)
+    return None
+
+
+def write_embedding_meta(dim: int) -> None:
+    _atomic_write(EMBEDDING_META_FILE, json.dumps({**embedding_signature(), "dim": dim}).encode("utf-8"))
 
-    index = _build_index(records)
+
+def check_embedding_compat() -> None:
+    # Older artifacts carry no metadata; they were built with the fp32 torch model.
+    built = {"model": "intfloat/e5-base-v2", "backend": "torch"}
+    if EMBEDDING_META_FILE.exists():
+        built = json.loads(EMBEDDING_META_FILE.read_text())
+    if built["model"] != EMBEDDING_MODEL:
+        raise RuntimeError(
+            f"Index was built with {built['model']} but EMBEDDING_MODEL is {EMBEDDING_MODEL}; "
+            "rebuild with: python -m scripts.ingest_corpus --force"
+        )
+    if built["backend"] == EMBEDDING_BACKEND:
+        return
+    parity = json.loads(PARITY_FILE.read_text()) if PARITY_FILE.exists() else {}
+    result = parity.get(EMBEDDING_BACKEND, {})
+    if result.get("reference") != built["backend"] or result.get("model") != EMBEDDING_MODEL or not result.get("compatible"):
+        raise RuntimeError(
+            f"Index vectors come from the {built['backend']} backend and {EMBEDDING_BACKEND} has no passing parity check; "
+            f"run python -m scripts.benchmark_embedder --backends {EMBEDDING_BACKEND} --reference {built['backend']} "
+            "or rebuild with python -m scripts.ingest_corpus --force"
+        )
+    logger.info("Serving %s queries against %s vectors (parity %.4f)", EMBEDDING_BACKEND, built["backend"], result["mean_cosine"])
+
+
+def load_index() -> Tuple[faiss.Index, RecordStore]:
+    records = _open_records()
+    if records is None or not INDEX_FILE.exists():
+        hint = "--reindex " if VECTORS_FILE.exists() else ""
+        raise FileNotFoundError(
+            f"Grievance index artifacts missing ({INDEX_FILE.name}, {STORE_DIR.name}); "
+            f"build them offline with: python -m scripts.ingest_corpus {hint}--index-type {INDEX_TYPE}"
+        )
+    check_embedding_compat()
+
+    index = configure_search(faiss.read_index(str(INDEX_FILE)))
+    if _catch_up(index, records):
+        write_index(index)
     return index, records
 
 
+def search_batch(index: faiss.Index, query_vectors: np.ndarray, top_k: int = 5, params=None):
+    query_vectors = np.ascontiguousarray(query_vectors, dtype="float32")
+    if params is None:
+        return index.search(query_vectors, top_k)
+    return index.search(query_vectors, top_k, params=params)
+
+
 def search(index: faiss.Index, query_vector: np.ndarray, top_k: int = 5):
-    query_vector = np.expand_dims(query_vector, axis=0)
-    scores, ids = index.search(query_vector, top_k)
+    scores, ids = search_batch(index, np.expand_dims(query_vector, axis=0), top_k)
     return scores[0], ids[0]
+
+
+class LiveIndex:
+    def __init__(self, index: faiss.Index, records: RecordStore):
+        self.index = index
+        self.records = records
+        self.id_map: Dict[str, int] = {str(record["id"]): pos for pos, record in enumerate(records)}
+        self.version = 0
+        self._lock = threading.RLock()
+        self._checkpoint_lock = threading.Lock()
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+        self._stop = threading.Event()
+        self._checkpointer: Optional[threading.Thread] = None
+        self._masks: "OrderedDict[Tuple, Tuple[int, np.ndarray]]" = OrderedDict()
+        self._partitions: "OrderedDict[Tuple, faiss.Index]" = OrderedDict()
+        self.lexical: Optional[BM25Index] = None
+        self.counters = {"global": 0, "partition": 0, "selector": 0, "fallback": 0, "synced": 0}
+        # Called with the vectors of rows other workers appended, e.g. to invalidate cached results.
+        self.on_sync: Optional[Callable[[np.ndarray], None]] = None
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            # Hybrid and filtered searches rescore candidates by id, which IVF lists need a direct map for.
+            ivf.make_direct_map()
+        if RETRIEVAL_MODE == "hybrid":
+            self._lexical_index()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _lexical_index(self) -> BM25Index:
+        with self._lock:
+            if self.lexical is None:
+                start = time.perf_counter()
+                self.lexical = BM25Index()
+                self.lexical.add(self.records.field(pos, "text") for pos in range(len(self.records)))
+                logger.info("Built BM25 index over %d records in %.1fs", len(self.lexical), time.perf_counter() - start)
+            return self.lexical
+
+    @staticmethod
+    def _filter_key(filters: Dict[str, str]) -> Tuple:
+        key = tuple(sorted((field, str(value).strip().lower()) for field, value in filters.items() if value))
+        for field, _ in key:
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Cannot filter on {field!r}; expected one of {', '.join(FILTER_FIELDS)}")
+        return key
+
+    def _filter_mask(self, key: Tuple) -> np.ndarray:
+        """Boolean mask over record positions matching every (field, value) in `key` (case-insensitive)."""
+        cached = self._masks.get(key)
+        if cached is not None and cached[0] == self.version:
+            self._masks.move_to_end(key)
+            return cached[1]
+        mask = np.ones(len(self.records), dtype=bool)
+        for field, value in key:
+            codes = [code for code, name in enumerate(self.records.vocab(field)) if name.lower() == value]
+            mask &= np.isin(self.records.codes(field)[: len(mask)], codes)
+        self._masks[key] = (self.version, mask)
+        if len(self._masks) > PARTITION_CACHE_SIZE:
+            self._masks.popitem(last=False)
+        return mask
+
+    def _partition(self, key: Tuple, allowed: np.ndarray) -> faiss.Index:
+        """Flat sub-index over one filter set's vectors, ids being global positions; kept current by `add`."""
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = faiss.IndexIDMap(faiss.IndexFlatIP(self.index.d))
+            partition.add_with_ids(self.index.reconstruct_batch(allowed), allowed)
+            self._partitions[key] = partition
+            if len(self._partitions) > PARTITION_CACHE_SIZE:
+                self._partitions.popitem(last=False)
+        else:
+            self._partitions.move_to_end(key)
+        return partition
+
+    @staticmethod
+    def _matches(record: Dict, key: Tuple) -> bool:
+        return all(str(record.get(field, "")).strip().lower() == value for field, value in key)
+
+    def _dense_scores(self, query_vector: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        return self.index.reconstruct_batch(np.asarray(ids, dtype="int64")) @ query_vector
+
+    def _filtered_search(self, query_vector: np.ndarray, top_k: int, key: Tuple, mask: np.ndarray):
+        allowed = np.flatnonzero(mask).astype("int64")
+        if len(allowed) <= PARTITION_MAX_SIZE:
+            self.counters["partition"] += 1
+            scores, ids = search_batch(self._partition(key, allowed), query_vector[None, :], top_k)
+        else:
+            # Partitions this large save little over a full scan and would duplicate too much memory.
+            self.counters["selector"] += 1
+            selector = faiss.IDSelectorBatch(allowed)
+            params = search_params(self.index, sel=selector)
+            scores, ids = search_batch(self.index, query_vector[None, :], top_k, params=params)
+        return scores[0], ids[0]
+
+    def retrieve(
+        self,
+        texts: List[str],
+        query_vectors: np.ndarray,
+        top_k: int = 5,
+        filters: Optional[List[Optional[Dict[str, str]]]] = None,
+        mode: Optional[str] = None,
+    ):
+        """Dense or hybrid (BM25 + dense, reciprocal-rank fused) top-k, optionally restricted per query by metadata.
+
+        A filter set with fewer than PARTITION_MIN_SIZE records falls back to the global search. Returned scores are
+        always dense cosine similarities so confidence and cache invalidation keep their meaning.
+        """
+        mode = mode or RETRIEVAL_MODE
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown RETRIEVAL_MODE {mode!r}; expected one of {', '.join(RETRIEVAL_MODES)}")
+        query_vectors = np.ascontiguousarray(query_vectors, dtype="float32")
+        filters = filters or [None] * len(texts)
+        depth = max(top_k, HYBRID_CANDIDATES) if mode == "hybrid" else top_k
+        out_scores = np.full((len(texts), top_k), -np.finfo("float32").max, dtype="float32")
+        out_ids = np.full((len(texts), top_k), -1, dtype="int64")
+
+        lexical = self._lexical_index() if mode == "hybrid" else None
+        with self._lock:
+            keys = [self._filter_key(f) if f else () for f in filters]
+            masks: List[Optional[np.ndarray]] = []
+            for key in keys:
+                mask = self._filter_mask(key) if key else None
+                if mask is not None and mask.sum() < PARTITION_MIN_SIZE:
+                    self.counters["fallback"] += 1
+                    mask = None
+                masks.append(mask)
+            dense: List[Tuple[np.ndarray, np.ndarray]] = [None] * len(texts)
+            unfiltered = [i for i, mask in enumerate(masks) if mask is None]
+            if unfiltered:
+                self.counters["global"] += len(unfiltered)
+                scores, ids = search_batch(self.index, query_vectors[unfiltered], depth)
+                for row, i in enumerate(unfiltered):
+                    dense[i] = (scores[row], ids[row])
+            for i, mask in enumerate(masks):
+                if mask is not None:
+                    dense[i] = self._filtered_search(query_vectors[i], depth, keys[i], mask)
+
+            for i, (scores, ids) in enumerate(dense):
+                if lexical is None:
+                    found = min(top_k, len(ids))
+                    out_scores[i, :found], out_ids[i, :found] = scores[:found], ids[:found]
+                    continue
+                _, lexical_ids = lexical.search(texts[i], depth, allowed=masks[i])
+                fused = np.asarray(reciprocal_rank_fusion([ids, lexical_ids], top_k), dtype="int64")
+                if len(fused):
+                    out_ids[i, : len(fused)] = fused
+                    out_scores[i, : len(fused)] = self._dense_scores(query_vectors[i], fused)
+        return out_scores, out_ids
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ):
+        params = search_params(self.index, nprobe=nprobe, ef_search=ef_search)
+        with self._lock:
+            return search_batch(self.index, query_vectors, top_k, params=params)
+
+    def add(self, records: List[Dict], vectors: Optional[np.ndarray] = None) -> List[int]:
+        keep, seen = [], set()
+        for i, record in enumerate(records):
+            record_id = str(record["id"])
+            if record_id not in self.id_map and record_id not in seen:
+                keep.append(i)
+                seen.add(record_id)
+        if keep:
+            new_records = [records[i] for i in keep]
+            if vectors is None:
+                new_vectors = embed_documents([record["text"] for record in new_records])
+            else:
+                new_vectors = np.ascontiguousarray(np.asarray(vectors, dtype="float32")[keep])
+            with self._lock:
+                start = self.records.extend(new_records)
+                self._index_rows(start)
+                self._index_new(new_records, new_vectors, start)
+            self.maybe_checkpoint()
+        return [self.id_map.get(str(record["id"]), -1) for record in records]
+
+    def _index_new(self, new_records: List, new_vectors: np.ndarray, start: int) -> None:
+        self.index.add(new_vectors)
+        if self.lexical is not None:
+            self.lexical.add(record["text"] for record in new_records)
+        for key, partition in self._partitions.items():
+            matched = [offset for offset, record in enumerate(new_records) if self._matches(record, key)]
+            if matched:
+                partition.add_with_ids(new_vectors[matched], np.asarray(matched, dtype="int64") + start)
+        for offset, record in enumerate(new_records):
+            self.id_map[str(record["id"])] = start + offset
+        self.version += 1
+        self._pending += len(new_records)
+
+    def _index_rows(self, upto: int, new_vectors: Optional[np.ndarray] = None) -> None:
+        """Index store rows [ntotal, upto), i.e. those other workers appended to the shared record store."""
+        start = self.index.ntotal
+        if upto <= start:
+            return
+        new_records = [self.records[pos] for pos in range(start, upto)]
+        if new_vectors is None:
+            # Their writers put the document vectors in the shared embedding store, so this rarely re-encodes.
+            new_vectors = embed_documents([record["text"] for record in new_records])
+        self._index_new(new_records, new_vectors, start)
+        self.counters["synced"] += len(new_records)
+        if self.on_sync is not None:
+            self.on_sync(new_vectors)
+
+    def sync(self) -> None:
+        with self._lock:
+            self.records.refresh()
+            start, upto = self.index.ntotal, len(self.records)
+            texts = [self.records.field(pos, "text") for pos in range(start, upto)]
+        if not texts:
+            return
+        vectors = embed_documents(texts)  # outside the lock so searches keep running
+        with self._lock:
+            # An add() in between indexes these rows itself.
+            if self.index.ntotal == start:
+                self._index_rows(upto, vectors)
+
+    def update(self, record_id: str, **fields) -> bool:
+        with self._lock:
+            pos = self.id_map.get(str(record_id))
+            if pos is None:
+                return False
+            self.records[pos] = {**self.records[pos], **fields}
+            self.version += 1
+            # A record moving between departments or wards invalidates the partitions built on that field.
+            for key in [key for key in self._partitions if any(field in fields for field, _ in key)]:
+                del self._partitions[key]
+        return True
+
+    def maybe_checkpoint(self) -> None:
+        due = time.monotonic() - self._last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS
+        if self._pending >= CHECKPOINT_EVERY or (self._pending and due):
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        with self._checkpoint_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                payload = faiss.serialize_index(self.index).tobytes()
+                written, self._pending = self._pending, 0
+            try:
+                _atomic_write(INDEX_FILE, payload)
+            except OSError:
+                with self._lock:
+                    self._pending += written
+                raise
+            self._last_checkpoint = time.monotonic()
+
+    def start_checkpointer(self, interval: float = SYNC_INTERVAL_SECONDS) -> None:
+        if self._checkpointer is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.sync()
+                except Exception:
+                    logger.exception("Record store sync failed")
+                try:
+                    self.maybe_checkpoint()
+                except OSError:
+                    logger.exception("Index checkpoint failed")
+
+        self._checkpointer = threading.Thread(target=run, name="index-checkpointer", daemon=True)
+        self._checkpointer.start()
+
+    def stats(self) -> Dict:
+        return {**self.counters, "partitions": len(self._partitions)}
+
+    def close(self) -> None:
+        self._stop.set()
+        self.checkpoint()
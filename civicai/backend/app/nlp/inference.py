@@ -1,17 +1,40 @@
-from typing import Dict, List
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from .embedder import detect_language, embed_query
 from .faiss_index import search
-from .translate import from_english, to_english
+from .translate import from_english_batch, to_english
 
+INFERENCE_CPU_WORKERS = int(os.getenv("INFERENCE_CPU_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+INFERENCE_IO_WORKERS = int(os.getenv("INFERENCE_IO_WORKERS", "16"))
 
-def infer_response(query: str, index, records: List[Dict], top_k: int = 5) -> Dict:
+FALLBACK_CASE = {
+    "department": "General Administration",
+    "solution": "Your request has been recorded.",
+    "resolution_days": 5,
+}
+
+
+@lru_cache(maxsize=1)
+def get_cpu_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=INFERENCE_CPU_WORKERS, thread_name_prefix="civicai-cpu")
+
+
+@lru_cache(maxsize=1)
+def get_io_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=INFERENCE_IO_WORKERS, thread_name_prefix="civicai-io")
+
+
+def prepare_query(query: str) -> Tuple[str, str]:
     lang = detect_language(query)
     english_query = to_english(query) if lang != "en" else query
+    return lang, english_query
 
-    qvec = embed_query(english_query)
-    scores, ids = search(index, qvec, top_k=top_k)
 
+def _select_cases(scores, ids, records: List[Dict]) -> Tuple[List[Dict], Dict]:
     similar_cases = []
     for score, idx in zip(scores, ids):
         if idx < 0 or idx >= len(records):
@@ -21,31 +44,75 @@ def infer_response(query: str, index, records: List[Dict], top_k: int = 5) -> Di
             {
                 "grievance_id": item["id"],
                 "department": item["department"],
-                "solution": from_english(item["solution"], lang),
+                "solution": item["solution"],
                 "similarity": round(float(score), 4),
             }
         )
 
-    best = records[ids[0]] if len(ids) and ids[0] >= 0 else {
-        "department": "General Administration",
-        "solution": "Your request has been recorded.",
-        "resolution_days": 5,
-    }
+    best = records[ids[0]] if len(ids) and ids[0] >= 0 else FALLBACK_CASE
+    return similar_cases, best
 
-    answer = (
-        "Recommended resolution steps:\n"
-        f"1) {best['solution']}\n"
-        "2) Keep your documents and complaint evidence ready.\n"
-        f"3) If unresolved in {best.get('resolution_days', 5)} days, reply with NOT SOLVED for auto-escalation."
-    )
 
-    localized_answer = from_english(answer, lang)
+def _build_response(answer: str, scores, best: Dict, similar_cases: List[Dict]) -> Dict:
     confidence = max(0.0, min(1.0, float(scores[0]) if len(scores) else 0.45))
-
     return {
-        "answer": localized_answer,
+        "answer": answer,
         "confidence": round(confidence, 3),
         "department": best["department"],
         "expected_resolution_time": f"{best.get('resolution_days', 5)} days",
         "similar_cases": similar_cases,
     }
+
+
+def _answer_text(best: Dict) -> str:
+    return (
+        "Recommended resolution steps:\n"
+        f"1) {best['solution']}\n"
+        "2) Keep your documents and complaint evidence ready.\n"
+        f"3) If unresolved in {best.get('resolution_days', 5)} days, reply with NOT SOLVED for auto-escalation."
+    )
+
+
+def compose_response(lang: str, scores, ids, records: List[Dict]) -> Dict:
+    similar_cases, best = _select_cases(scores, ids, records)
+    translated = from_english_batch([_answer_text(best)] + [case["solution"] for case in similar_cases], lang)
+    for case, solution in zip(similar_cases, translated[1:]):
+        case["solution"] = solution
+    return _build_response(translated[0], scores, best, similar_cases)
+
+
+def infer_response(query: str, index, records: List[Dict], top_k: int = 5) -> Dict:
+    lang, english_query = prepare_query(query)
+    qvec = embed_query(english_query)
+    scores, ids = search(index, qvec, top_k=top_k)
+    return compose_response(lang, scores, ids, records)
+
+
+async def prepare_query_async(query: str) -> Tuple[str, str]:
+    loop = asyncio.get_running_loop()
+    lang = await loop.run_in_executor(get_cpu_executor(), detect_language, query)
+    if lang == "en":
+        return lang, query
+    english_query = await loop.run_in_executor(get_io_executor(), to_english, query)
+    return lang, english_query
+
+
+async def compose_response_async(lang: str, scores, ids, records: List[Dict]) -> Dict:
+    similar_cases, best = _select_cases(scores, ids, records)
+    texts = [_answer_text(best)] + [case["solution"] for case in similar_cases]
+    if lang == "en":
+        translated = texts
+    else:
+        loop = asyncio.get_running_loop()
+        translated = await loop.run_in_executor(get_io_executor(), from_english_batch, texts, lang)
+    for case, solution in zip(similar_cases, translated[1:]):
+        case["solution"] = solution
+    return _build_response(translated[0], scores, best, similar_cases)
+
+
+async def infer_response_async(query: str, index, records: List[Dict], top_k: int = 5) -> Dict:
+    lang, english_query = await prepare_query_async(query)
+    loop = asyncio.get_running_loop()
+    qvec = await loop.run_in_executor(get_cpu_executor(), embed_query, english_query)
+    scores, ids = await loop.run_in_executor(get_cpu_executor(), search, index, qvec, top_k)
+    return await compose_response_async(lang, scores, ids, records)
@@ -0,0 +1,98 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have i in is it its my of on or our so that the their there "
+    "this to was we were with you your not no do does did can will just very".split()
+)
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Append-only in-memory inverted index; document ids are record store positions."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._freqs: Dict[str, List[int]] = defaultdict(list)
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lengths: List[int] = []
+        self._length_array: Optional[np.ndarray] = None
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            doc_id = len(self._lengths)
+            counts = Counter(tokenize(text))
+            for term, freq in counts.items():
+                self._postings[term].append(doc_id)
+                self._freqs[term].append(freq)
+                self._arrays.pop(term, None)
+            length = sum(counts.values())
+            self._lengths.append(length)
+            self._total_length += length
+        self._length_array = None
+
+    def document_frequency(self, term: str) -> int:
+        return len(self._postings.get(term, ()))
+
+    def _term_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            arrays = self._arrays[term] = (
+                np.asarray(self._postings[term], dtype=np.int64),
+                np.asarray(self._freqs[term], dtype=np.float32),
+            )
+        return arrays
+
+    def search(self, query: str, top_k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k BM25 matches; `allowed` is a boolean mask over positions applied before scoring."""
+        n_docs = len(self._lengths)
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+        if not n_docs or not terms:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        if self._length_array is None or len(self._length_array) != n_docs:
+            self._length_array = np.asarray(self._lengths, dtype=np.float32)
+        lengths = self._length_array
+        avg_length = self._total_length / n_docs or 1.0
+        doc_parts, score_parts = [], []
+        for term in terms:
+            docs, freqs = self._term_arrays(term)
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            if allowed is not None:
+                keep = allowed[docs]
+                docs, freqs = docs[keep], freqs[keep]
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avg_length)
+            doc_parts.append(docs)
+            score_parts.append(idf * freqs * (self.k1 + 1) / (freqs + norm))
+
+        docs = np.concatenate(doc_parts)
+        if not len(docs):
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        unique, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts)).astype(np.float32)
+        top = np.argsort(-scores, kind="stable")[:top_k]
+        return scores[top], unique[top]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], top_k: int, k: int = RRF_K) -> List[int]:
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            if doc_id >= 0:
+                fused[int(doc_id)] += 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)[:top_k]
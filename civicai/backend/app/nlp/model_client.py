@@ -0,0 +1,79 @@
+import os
+import queue
+import threading
+from functools import lru_cache
+from multiprocessing.connection import Client, Connection
+from typing import Dict
+
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET", "")
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY", "civicai-model-server").encode("utf-8")
+MODEL_CLIENT_POOL_SIZE = int(os.getenv("MODEL_CLIENT_POOL_SIZE", "8"))
+
+_serving = threading.Event()
+
+
+def serve_locally() -> None:
+    # Called by the model server itself so its own model calls never loop back over the socket.
+    _serving.set()
+
+
+def remote_enabled() -> bool:
+    return bool(MODEL_SERVER_SOCKET) and not _serving.is_set()
+
+
+class RemoteError(RuntimeError):
+    pass
+
+
+class ModelClient:
+    def __init__(self, address: str = MODEL_SERVER_SOCKET, authkey: bytes = MODEL_SERVER_AUTHKEY, pool_size: int = MODEL_CLIENT_POOL_SIZE):
+        self.address = address
+        self.authkey = authkey
+        self._idle: "queue.LifoQueue[Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.calls = 0
+        self.reconnects = 0
+
+    def _connect(self) -> Connection:
+        return Client(self.address, family="AF_UNIX", authkey=self.authkey)
+
+    def call(self, method: str, *args, **kwargs):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                try:
+                    conn.send((method, args, kwargs))
+                    status, payload = conn.recv()
+                except (EOFError, OSError):
+                    # The server restarted since this connection was pooled; retry once on a fresh one.
+                    conn.close()
+                    self.reconnects += 1
+                    conn = self._connect()
+                    conn.send((method, args, kwargs))
+                    status, payload = conn.recv()
+            except BaseException:
+                conn.close()
+                raise
+            self._idle.put(conn)
+        self.calls += 1
+        if status == "error":
+            raise RemoteError(payload)
+        return payload
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "reconnects": self.reconnects, "idle_connections": self._idle.qsize()}
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+@lru_cache(maxsize=1)
+def get_model_client() -> ModelClient:
+    return ModelClient()
@@ -0,0 +1,166 @@
+import copy
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "2048"))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+
+def normalize_query(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower()).strip(" .!?")
+
+
+def _key(query: str, scope: str) -> str:
+    # Filtered searches answer from a different candidate set, so they never share entries with unfiltered ones.
+    key = normalize_query(query)
+    return f"{scope}\x1f{key}" if scope else key
+
+
+class _Entry:
+    __slots__ = ("slot", "lang", "scope", "response", "ids", "min_score", "expires", "keys")
+
+    def __init__(
+        self, slot: int, lang: str, scope: str, response: Dict, ids: Iterable[int], min_score: float, expires: float
+    ):
+        self.slot = slot
+        self.lang = lang
+        self.scope = scope
+        self.response = response
+        self.ids = {int(i) for i in ids if i >= 0}
+        self.min_score = min_score
+        self.expires = expires
+        self.keys: List[str] = []
+
+
+class QueryCache:
+    def __init__(
+        self,
+        max_size: int = QUERY_CACHE_SIZE,
+        ttl_seconds: float = QUERY_CACHE_TTL_SECONDS,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._exact: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_size, dtype=bool)
+        self._free = list(range(max_size - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def _drop(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        for key in entry.keys:
+            self._exact.pop(key, None)
+        self._valid[slot] = False
+        self._free.append(slot)
+
+    def _hit(self, entry: _Entry, counter: str) -> Dict:
+        self._entries.move_to_end(entry.slot)
+        self.counters[counter] += 1
+        return copy.deepcopy(entry.response)
+
+    def get_exact(self, query: str, scope: str = "", with_vector: bool = False):
+        key = _key(query, scope)
+        with self._lock:
+            slot = self._exact.get(key)
+            if slot is None:
+                return None
+            entry = self._entries[slot]
+            if entry.expires < time.monotonic():
+                self._drop(slot)
+                return None
+            response = self._hit(entry, "exact_hits")
+            return (response, self._vectors[slot].copy()) if with_vector else response
+
+    def get_semantic(self, query: str, lang: str, vector: np.ndarray, scope: str = "") -> Optional[Dict]:
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                self.counters["misses"] += 1
+                return None
+            sims = np.where(self._valid, self._vectors @ vector, -np.inf)
+            now = time.monotonic()
+            for slot in np.argsort(-sims)[:8]:
+                if sims[slot] < self.threshold:
+                    break
+                entry = self._entries[int(slot)]
+                if entry.expires < now:
+                    self._drop(entry.slot)
+                    continue
+                if entry.lang != lang or entry.scope != scope:
+                    continue
+                key = _key(query, scope)
+                if key not in self._exact:
+                    self._exact[key] = entry.slot
+                    entry.keys.append(key)
+                return self._hit(entry, "semantic_hits")
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, query: str, lang: str, vector: np.ndarray, scores, ids, response: Dict, scope: str = "") -> None:
+        if not self.max_size:
+            return
+        key = _key(query, scope)
+        with self._lock:
+            if key in self._exact:
+                self._drop(self._exact[key])
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, len(vector)), dtype="float32")
+            if not self._free:
+                self._drop(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+            slot = self._free.pop()
+            # Hybrid results are rank-fused, so the weakest dense score is not necessarily the last one.
+            min_score = float(np.min(scores)) if len(scores) else -np.inf
+            entry = _Entry(
+                slot, lang, scope, copy.deepcopy(response), ids, min_score, time.monotonic() + self.ttl_seconds
+            )
+            entry.keys.append(key)
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._entries[slot] = entry
+            self._exact[key] = slot
+
+    def invalidate_vectors(self, vectors: np.ndarray) -> int:
+        # A new index vector only changes a cached answer if it would rank inside that query's top-k.
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                return 0
+            best = (self._vectors @ np.asarray(vectors, dtype="float32").T).max(axis=1)
+            stale = [slot for slot, entry in self._entries.items() if best[slot] >= entry.min_score]
+            for slot in stale:
+                self._drop(slot)
+            self.counters["invalidations"] += len(stale)
+            return len(stale)
+
+    def invalidate_ids(self, ids: Iterable[int]) -> int:
+        ids = {int(i) for i in ids}
+        with self._lock:
+            stale = [slot for slot, entry in self._entries.items() if entry.ids & ids]
+            for slot in stale:
+                self._drop(slot)
+            self.counters["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in list(self._entries):
+                self._drop(slot)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["exact_hits"] + self.counters["semantic_hits"] + self.counters["misses"]
+        hits = self.counters["exact_hits"] + self.counters["semantic_hits"]
+        return {
+            **self.counters,
+            "size": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
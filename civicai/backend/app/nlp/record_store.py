@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+TEXT_FIELDS = ("id", "text", "solution")
+CATEGORICAL_FIELDS = ("department", "location")
+NUMERIC_FIELDS = ("resolution_days",)
+FIELDS = TEXT_FIELDS + CATEGORICAL_FIELDS + NUMERIC_FIELDS
+MANIFEST = "manifest.json"
+WRITE_LOCK = "write.lock"
+FORMAT_VERSION = 1
+
+
+def _fsync_append(path: Path, data: bytes) -> None:
+    with open(path, "ab") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _map(path: Path, dtype, shape) -> np.ndarray:
+    if not shape[0]:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class StoredRecord(Mapping):
+    __slots__ = ("_store", "_pos")
+
+    def __init__(self, store: "RecordStore", pos: int):
+        self._store = store
+        self._pos = pos
+
+    def __getitem__(self, field: str):
+        return self._store.field(self._pos, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"StoredRecord({dict(self)!r})"
+
+
+class RecordStore:
+    """Columnar, memory-mapped grievance metadata.
+
+    Text fields are UTF-8 blobs addressed by an ``(offset, length)`` int64 table,
+    department/location are dictionary-encoded int32 codes and numeric fields are
+    fixed-width int32 columns. Files are mapped read-only so every worker process
+    shares the same page cache; rows are decoded only when a field is accessed.
+    ``manifest.json`` holds the committed row count and is replaced atomically
+    after each append, which makes it the commit point for writers. Writers in
+    different processes serialise on ``write.lock`` and re-read the manifest
+    under it, so each append lands after the latest committed row.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._load()
+
+    @classmethod
+    def create(cls, path: Path, records: Iterable[Dict]) -> "RecordStore":
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in os.listdir(path):
+            os.remove(path / name)
+        cls._write_manifest(path, {"version": FORMAT_VERSION, "count": 0, "vocab": {f: [] for f in CATEGORICAL_FIELDS}})
+        store = cls(path)
+        store.extend(records)
+        return store
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (Path(path) / MANIFEST).exists()
+
+    @staticmethod
+    def _write_manifest(path: Path, manifest: Dict) -> None:
+        tmp_path = path / (MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, ensure_ascii=False)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path / MANIFEST)
+
+    @contextmanager
+    def _writer(self):
+        with self._lock, open(self.path / WRITE_LOCK, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                # Another process may have committed rows or vocabulary since this one last looked.
+                self._load(truncate=True)
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _load(self, truncate: bool = False) -> None:
+        manifest = json.loads((self.path / MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported record store version {manifest.get('version')} at {self.path}")
+        self._manifest = manifest
+        self._vocab = {f: list(manifest["vocab"][f]) for f in CATEGORICAL_FIELDS}
+        self._codes_of = {f: {value: code for code, value in enumerate(self._vocab[f])} for f in CATEGORICAL_FIELDS}
+        if truncate:
+            # Only safe under the write lock; otherwise the rows may belong to an append still in flight.
+            self._truncate_rows(manifest["count"])
+        self._remap(manifest["count"])
+
+    def _truncate_rows(self, count: int) -> None:
+        # Rows written by an append that never reached its manifest commit are dropped.
+        for name, width in self._row_files():
+            file_path = self.path / name
+            if file_path.exists() and file_path.stat().st_size > count * width:
+                os.truncate(file_path, count * width)
+
+    def _row_files(self):
+        for f in TEXT_FIELDS:
+            yield f"{f}.pos", 16
+        for f in CATEGORICAL_FIELDS:
+            yield f"{f}.codes", 4
+        for f in NUMERIC_FIELDS:
+            yield f"{f}.i32", 4
+
+    def _remap(self, count: int) -> None:
+        self.count = count
+        self._pos = {f: _map(self.path / f"{f}.pos", "<i8", (count, 2)) for f in TEXT_FIELDS}
+        self._blob = {}
+        for f in TEXT_FIELDS:
+            blob_path = self.path / f"{f}.blob"
+            size = blob_path.stat().st_size if blob_path.exists() else 0
+            self._blob[f] = _map(blob_path, "u1", (size,))
+        self._codes = {f: _map(self.path / f"{f}.codes", "<i4", (count,)) for f in CATEGORICAL_FIELDS}
+        self._numeric = {f: _map(self.path / f"{f}.i32", "<i4", (count,)) for f in NUMERIC_FIELDS}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[StoredRecord]:
+        for pos in range(self.count):
+            yield StoredRecord(self, pos)
+
+    def __getitem__(self, pos: int) -> StoredRecord:
+        pos = int(pos)
+        if pos < 0:
+            pos += self.count
+        if not 0 <= pos < self.count:
+            raise IndexError(pos)
+        return StoredRecord(self, pos)
+
+    def __setitem__(self, pos: int, record: Mapping) -> None:
+        self.update(pos, **{f: record[f] for f in FIELDS if f in record})
+
+    def field(self, pos: int, field: str):
+        if field in TEXT_FIELDS:
+            offset, length = self._pos[field][pos]
+            if offset + length > len(self._blob[field]):
+                self.refresh()  # rewritten by another process after our blob was mapped
+            return bytes(self._blob[field][offset : offset + length]).decode("utf-8")
+        if field in CATEGORICAL_FIELDS:
+            code = self._codes[field][pos]
+            if code >= len(self._vocab[field]):
+                self.refresh()
+            return self._vocab[field][code]
+        if field in NUMERIC_FIELDS:
+            return int(self._numeric[field][pos])
+        raise KeyError(field)
+
+    def codes(self, field: str) -> np.ndarray:
+        return self._codes[field]
+
+    def vocab(self, field: str) -> List[str]:
+        return self._vocab[field]
+
+    def _encode(self, field: str, value) -> int:
+        value = str(value)
+        code = self._codes_of[field].get(value)
+        if code is None:
+            code = len(self._vocab[field])
+            self._vocab[field].append(value)
+            self._codes_of[field][value] = code
+        return code
+
+    def _blob_size(self, field: str) -> int:
+        blob_path = self.path / f"{field}.blob"
+        return blob_path.stat().st_size if blob_path.exists() else 0
+
+    def extend(self, records: Iterable[Dict]) -> int:
+        """Append `records` and return the position of the first one."""
+        records = list(records)
+        if not records:
+            return self.count
+        with self._writer():
+            start = self.count
+            for f in TEXT_FIELDS:
+                offset = self._blob_size(f)
+                encoded = [str(record[f]).encode("utf-8") for record in records]
+                lengths = np.fromiter((len(b) for b in encoded), dtype="<i8", count=len(encoded))
+                starts = offset + np.concatenate(([0], np.cumsum(lengths)[:-1])).astype("<i8")
+                _fsync_append(self.path / f"{f}.blob", b"".join(encoded))
+                _fsync_append(self.path / f"{f}.pos", np.stack([starts, lengths], axis=1).tobytes())
+            for f in CATEGORICAL_FIELDS:
+                codes = np.array([self._encode(f, record[f]) for record in records], dtype="<i4")
+                _fsync_append(self.path / f"{f}.codes", codes.tobytes())
+            for f in NUMERIC_FIELDS:
+                values = np.array([int(record[f]) for record in records], dtype="<i4")
+                _fsync_append(self.path / f"{f}.i32", values.tobytes())
+            count = start + len(records)
+            self._commit(count)
+            self._remap(count)
+        return start
+
+    def append(self, record: Dict) -> None:
+        self.extend([record])
+
+    def update(self, pos: int, **fields) -> None:
+        with self._writer():
+            for f, value in fields.items():
+                if f in TEXT_FIELDS:
+                    if self.field(pos, f) == str(value):
+                        continue
+                    data = str(value).encode("utf-8")
+                    offset = self._blob_size(f)
+                    _fsync_append(self.path / f"{f}.blob", data)
+                    self._write_row(f"{f}.pos", pos, np.array([offset, len(data)], dtype="<i8"))
+                elif f in CATEGORICAL_FIELDS:
+                    self._write_row(f"{f}.codes", pos, np.array([self._encode(f, value)], dtype="<i4"))
+                elif f in NUMERIC_FIELDS:
+                    self._write_row(f"{f}.i32", pos, np.array([int(value)], dtype="<i4"))
+            self._commit(self.count)
+            self._remap(self.count)
+
+    def _write_row(self, name: str, pos: int, row: np.ndarray) -> None:
+        with open(self.path / name, "r+b") as handle:
+            handle.seek(pos * row.nbytes)
+            handle.write(row.tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def truncate(self, count: int) -> None:
+        with self._writer():
+            if count >= self.count:
+                return
+            self._commit(count)
+            self._truncate_rows(count)
+            self._remap(count)
+
+    def _commit(self, count: int) -> None:
+        self._manifest = {"version": FORMAT_VERSION, "count": count, "vocab": self._vocab}
+        self._write_manifest(self.path, self._manifest)
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._load()
+
+
+def convert_json(meta_file: Path, store_path: Path) -> RecordStore:
+    records = json.loads(Path(meta_file).read_text(encoding="utf-8"))
+    return RecordStore.create(store_path, records)
@@ -1,26 +1,42 @@
+import os
 from functools import lru_cache
 from typing import Dict, List
 
-from transformers import pipeline
+from .model_client import get_model_client, remote_enabled
+
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "cardiffnlp/twitter-roberta-base-sentiment-latest")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "64"))
+LABELS = ("positive", "neutral", "negative")
 
 
 @lru_cache(maxsize=1)
 def get_sentiment_pipeline():
-    return pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment-latest")
+    from transformers import pipeline
 
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
 
-def analyze_sentiments(texts: List[str]) -> Dict[str, int]:
+
+def _normalize_label(label: str) -> str:
+    label = label.lower()
+    if "neg" in label:
+        return "negative"
+    if "neu" in label:
+        return "neutral"
+    return "positive"
+
+
+def classify_sentiments(texts: List[str], batch_size: int = SENTIMENT_BATCH_SIZE) -> List[str]:
     if not texts:
-        return {"positive": 0, "neutral": 0, "negative": 0}
+        return []
+    if remote_enabled():
+        return get_model_client().call("classify_sentiments", list(texts), batch_size=batch_size)
     classifier = get_sentiment_pipeline()
-    results = classifier(texts[:128], truncation=True)
-    summary = {"positive": 0, "neutral": 0, "negative": 0}
-    for row in results:
-        label = row["label"].lower()
-        if "neg" in label:
-            summary["negative"] += 1
-        elif "neu" in label:
-            summary["neutral"] += 1
-        else:
-            summary["positive"] += 1
+    results = classifier(texts, truncation=True, batch_size=batch_size)
+    return [_normalize_label(row["label"]) for row in results]
+
+
+def analyze_sentiments(texts: List[str]) -> Dict[str, int]:
+    summary = {label: 0 for label in LABELS}
+    for label in classify_sentiments(texts):
+        summary[label] += 1
     return summary
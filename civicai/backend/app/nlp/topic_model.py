@@ -1,15 +1,26 @@
+import os
+import pickle
+import threading
 from collections import Counter
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Sequence
 
-from sklearn.cluster import MiniBatchKMeans
+import numpy as np
 
 from .embedder import embed_documents
 
+BASE_DIR = Path(__file__).resolve().parents[2]
+TOPIC_MODEL_FILE = Path(os.getenv("DATA_DIR", BASE_DIR / "data")) / "topic_model.pkl"
+TOPIC_COUNT = int(os.getenv("TOPIC_COUNT", "8"))
+REPRESENTATIVE_POOL = int(os.getenv("TOPIC_REPRESENTATIVE_POOL", "32"))
+
 
 def extract_topics(texts: List[str], n_topics: int = 6) -> List[Dict]:
     if not texts:
         return []
 
+    from sklearn.cluster import MiniBatchKMeans
+
     n_clusters = min(n_topics, max(1, len(texts)))
     vectors = embed_documents(texts)
     model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init="auto")
@@ -21,3 +32,92 @@ def extract_topics(texts: List[str], n_topics: int = 6) -> List[Dict]:
         representative = next(texts[i] for i, l in enumerate(labels) if l == label)
         topics.append({"topic_id": int(label), "size": int(size), "representative_text": representative[:180]})
     return topics
+
+
+class TopicModel:
+    def __init__(self, n_topics: int = TOPIC_COUNT, pool_size: int = REPRESENTATIVE_POOL):
+        from sklearn.cluster import MiniBatchKMeans
+
+        self.n_topics = n_topics
+        self.pool_size = pool_size
+        self.kmeans = MiniBatchKMeans(n_clusters=n_topics, random_state=42, n_init=3)
+        self.counts = np.zeros(n_topics, dtype=np.int64)
+        self.pools: List[List] = [[] for _ in range(n_topics)]
+        self.last_complaint_id = 0
+        self.fitted = False
+        self._pending: List = []
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def update(self, complaint_ids: Sequence[int], texts: Sequence[str], vectors: np.ndarray) -> None:
+        if not len(texts):
+            return
+        with self.lock:
+            vectors = np.asarray(vectors, dtype="float32")
+            if not self.fitted:
+                self._pending.extend(zip(texts, vectors))
+                if len(self._pending) < self.n_topics:
+                    self.last_complaint_id = max(self.last_complaint_id, max(complaint_ids))
+                    return
+                texts = [text for text, _ in self._pending]
+                vectors = np.stack([vector for _, vector in self._pending])
+                self._pending = []
+                self.kmeans.fit(vectors)
+                self.fitted = True
+            else:
+                self.kmeans.partial_fit(vectors)
+
+            labels = self.kmeans.predict(vectors)
+            self.counts += np.bincount(labels, minlength=self.n_topics)
+            for text, vector, label in zip(texts, vectors, labels):
+                self.pools[label].append((text, vector))
+            for label in set(labels.tolist()):
+                self._trim(label)
+            self.last_complaint_id = max(self.last_complaint_id, max(complaint_ids))
+
+    def _trim(self, label: int) -> None:
+        pool = self.pools[label]
+        if len(pool) <= self.pool_size:
+            return
+        distances = self._distances(label, pool)
+        keep = np.argsort(distances)[: self.pool_size]
+        self.pools[label] = [pool[i] for i in keep]
+
+    def _distances(self, label: int, pool: List) -> np.ndarray:
+        centroid = self.kmeans.cluster_centers_[label]
+        return np.linalg.norm(np.stack([vector for _, vector in pool]) - centroid, axis=1)
+
+    def topics(self) -> List[Dict]:
+        with self.lock:
+            if not self.fitted:
+                return [
+                    {"topic_id": i, "size": 1, "representative_text": text[:180]}
+                    for i, (text, _) in enumerate(self._pending)
+                ]
+            topics = []
+            for label in np.argsort(-self.counts, kind="stable"):
+                pool = self.pools[label]
+                if not self.counts[label] or not pool:
+                    continue
+                representative = pool[int(np.argmin(self._distances(label, pool)))][0]
+                topics.append(
+                    {"topic_id": int(label), "size": int(self.counts[label]), "representative_text": representative[:180]}
+                )
+            return topics
+
+    @classmethod
+    def load(cls, path: Path = TOPIC_MODEL_FILE) -> "TopicModel":
+        if path.exists():
+            with open(path, "rb") as handle:
+                model = pickle.load(handle)
+            if isinstance(model, cls) and model.n_topics == TOPIC_COUNT:
+                return model
+        return cls()
@@ -1,26 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
 from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from googletrans import Translator
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "")
+TRANSLATION_PHRASEBOOK = os.getenv("TRANSLATION_PHRASEBOOK", "")
+
+
+class GoogleBackend:
+    def __init__(self):
+        from googletrans import Translator
+
+        self.translator = Translator()
+
+    def translate(self, texts: List[str], dest: str) -> List[str]:
+        results = self.translator.translate(texts, dest=dest)
+        return [row.text for row in results]
+
+
+class OfflineBackend:
+    def __init__(self, phrasebook: Optional[Dict[str, Dict[str, str]]] = None):
+        if phrasebook is None and TRANSLATION_PHRASEBOOK:
+            with open(TRANSLATION_PHRASEBOOK, encoding="utf-8") as handle:
+                phrasebook = json.load(handle)
+        self.phrasebook = phrasebook or {}
+
+    def translate(self, texts: List[str], dest: str) -> List[str]:
+        table = self.phrasebook.get(dest, {})
+        return [table.get(text, text) for text in texts]
+
+
+BACKENDS: Dict[str, Callable[[], object]] = {
+    "google": GoogleBackend,
+    "offline": OfflineBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], object]) -> None:
+    BACKENDS[name] = factory
+    get_backend.cache_clear()
 
 
 @lru_cache(maxsize=1)
-def get_translator() -> Translator:
-    return Translator()
+def get_backend():
+    if TRANSLATION_BACKEND not in BACKENDS:
+        raise ValueError(f"Unknown TRANSLATION_BACKEND {TRANSLATION_BACKEND!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[TRANSLATION_BACKEND]()
+
+
+class TranslationCache:
+    def __init__(self, max_size: int = TRANSLATION_CACHE_SIZE, path: str = TRANSLATION_CACHE_PATH):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "text TEXT NOT NULL, dest TEXT NOT NULL, translated TEXT NOT NULL, PRIMARY KEY (text, dest))"
+            )
+            self._db.commit()
+
+    def get_many(self, texts: Iterable[str], dest: str) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        missing: List[str] = []
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                key = (text, dest)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[text] = self._entries[key]
+                else:
+                    missing.append(text)
+            if missing and self._db is not None:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._db.execute(
+                    f"SELECT text, translated FROM translations WHERE dest = ? AND text IN ({placeholders})",
+                    [dest, *missing],
+                ).fetchall()
+                for text, translated in rows:
+                    found[text] = translated
+                    self._remember((text, dest), translated)
+            self.hits += len(found)
+            self.misses += len([text for text in missing if text not in found])
+        return found
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], dest: str) -> None:
+        pairs = list(pairs)
+        with self._lock:
+            for text, translated in pairs:
+                self._remember((text, dest), translated)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO translations (text, dest, translated) VALUES (?, ?, ?)",
+                    [(text, dest, translated) for text, translated in pairs],
+                )
+                self._db.commit()
+
+    def _remember(self, key: Tuple[str, str], value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> TranslationCache:
+    return TranslationCache()
+
+
+def translate_batch(texts: Sequence[str], dest: str) -> List[str]:
+    if not texts:
+        return []
+    cache = get_cache()
+    results = cache.get_many(texts, dest)
+    missing = list(dict.fromkeys(text for text in texts if text not in results))
+    if missing:
+        try:
+            translated = get_backend().translate(missing, dest)
+        except Exception:
+            translated = missing
+        else:
+            cache.put_many(zip(missing, translated), dest)
+        results.update(zip(missing, translated))
+    return [results[text] for text in texts]
 
 
 def to_english(text: str) -> str:
-    try:
-        translated = get_translator().translate(text, dest="en")
-        return translated.text
-    except Exception:
-        return text
+    return translate_batch([text], "en")[0]
 
 
 def from_english(text: str, target_lang: str) -> str:
     if target_lang == "en":
         return text
-    try:
-        translated = get_translator().translate(text, dest=target_lang)
-        return translated.text
-    except Exception:
-        return text
+    return translate_batch([text], target_lang)[0]
+
+
+def from_english_batch(texts: Sequence[str], target_lang: str) -> List[str]:
+    if target_lang == "en":
+        return list(texts)
+    return translate_batch(texts, target_lang)
@@ -1,9 +1,14 @@
 import io
+import logging
+import os
 from functools import lru_cache
-from typing import Tuple
+from typing import List, Optional, Tuple
 
+import numpy as np
 from PIL import Image
-from transformers import pipeline
+
+from .batching import MicroBatcher
+from .model_client import get_model_client, remote_enabled
 
 LABEL_TO_DEPARTMENT = {
     "garbage dump": "Solid Waste Management",
@@ -14,25 +19,83 @@ LABEL_TO_DEPARTMENT = {
     "pothole": "Roads and Infrastructure",
     "streetlight outage": "Electrical Department",
 }
+LABEL_TEMPLATE = "This is a photo of {}."
+UNCLASSIFIED = ("unclassified civic issue", "General Administration", 0.0)
+
+logger = logging.getLogger(__name__)
+
+VISION_MODEL = os.getenv("VISION_MODEL", "openai/clip-vit-base-patch32")
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "448"))
+VISION_MAX_BATCH_SIZE = int(os.getenv("VISION_MAX_BATCH_SIZE", "16"))
+VISION_MAX_WAIT_MS = float(os.getenv("VISION_MAX_WAIT_MS", "10"))
+
+
+class ClipClassifier:
+    def __init__(self, model_name: str = VISION_MODEL):
+        import torch
+        from transformers import CLIPModel, CLIPProcessor
+
+        self.torch = torch
+        self.model = CLIPModel.from_pretrained(model_name).eval()
+        self.processor = CLIPProcessor.from_pretrained(model_name)
+        self.labels = list(LABEL_TO_DEPARTMENT)
+        # Label prompts never change, so their text features are computed once instead of per image.
+        with torch.inference_mode():
+            inputs = self.processor(text=[LABEL_TEMPLATE.format(label) for label in self.labels], return_tensors="pt", padding=True)
+            features = self.model.get_text_features(**inputs)
+        self.label_features = features / features.norm(dim=-1, keepdim=True)
+        self.logit_scale = self.model.logit_scale.exp()
+
+    def classify(self, images: List[Image.Image]) -> List[Tuple[str, str, float]]:
+        torch = self.torch
+        with torch.inference_mode():
+            inputs = self.processor(images=images, return_tensors="pt")
+            features = self.model.get_image_features(**inputs)
+            features = features / features.norm(dim=-1, keepdim=True)
+            probs = (self.logit_scale * features @ self.label_features.T).softmax(dim=-1).numpy()
+        results = []
+        for row in probs:
+            issue = self.labels[int(np.argmax(row))]
+            results.append((issue, LABEL_TO_DEPARTMENT[issue], round(float(row.max()), 3)))
+        return results
 
 
 @lru_cache(maxsize=1)
-def get_zero_shot_vision():
+def get_zero_shot_vision() -> Optional[ClipClassifier]:
     try:
-        return pipeline("zero-shot-image-classification", model="openai/clip-vit-base-patch32")
+        return ClipClassifier()
     except Exception:
+        logger.exception("Loading %s failed; image complaints will be unclassified", VISION_MODEL)
         return None
 
 
-def detect_issue_from_image(image_bytes: bytes) -> Tuple[str, str, float]:
+def decode_image(image_bytes: bytes) -> Image.Image:
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # JPEG draft mode decodes at a reduced scale, which is most of the cost for phone photos.
+        image.draft("RGB", (VISION_MAX_SIDE, VISION_MAX_SIDE))
+        image = image.convert("RGB")
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValueError("Unsupported or corrupt image") from exc
+    image.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE))
+    return image
+
+
+def classify_images(images: List[Image.Image]) -> List[Tuple[str, str, float]]:
+    if not images:
+        return []
+    if remote_enabled():
+        return get_model_client().call("classify_images", images)
     model = get_zero_shot_vision()
     if model is None:
-        return "unclassified civic issue", "General Administration", 0.0
-
-    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    labels = list(LABEL_TO_DEPARTMENT.keys())
-    result = model(image, candidate_labels=labels)
-    best = result[0]
-    issue = best["label"]
-    score = float(best["score"])
-    return issue, LABEL_TO_DEPARTMENT.get(issue, "General Administration"), round(score, 3)
+        return [UNCLASSIFIED] * len(images)
+    return model.classify(images)
+
+
+@lru_cache(maxsize=1)
+def get_vision_batcher() -> MicroBatcher:
+    return MicroBatcher(classify_images, max_batch_size=VISION_MAX_BATCH_SIZE, max_wait_ms=VISION_MAX_WAIT_MS, name="vision-batcher")
+
+
+def detect_issue_from_image(image_bytes: bytes) -> Tuple[str, str, float]:
+    return get_vision_batcher()(decode_image(image_bytes))
@@ -18,6 +18,9 @@ class LoginResponse(BaseModel):
 class ChatRequest(BaseModel):
     user_id: int
     message: str
+    # Restrict similar-case retrieval to one ward and/or department; small partitions fall back to the whole corpus.
+    location: Optional[str] = None
+    department: Optional[str] = None
 
 
 class SimilarCase(BaseModel):
@@ -46,6 +49,14 @@ class ComplaintResponse(BaseModel):
     department: str
     status: str
     sla_hours: int
+    # Set when the complaint repeats an open ticket nearby; ticket_id is then that ticket.
+    duplicate_of: Optional[str] = None
+    report_count: int = 1
+
+
+class ImageComplaintResponse(ComplaintResponse):
+    detected_issue: str
+    confidence: float
 
 
 class ComplaintStatusResponse(BaseModel):
@@ -54,6 +65,12 @@ class ComplaintStatusResponse(BaseModel):
     department: str
     sla_hours: int
     created_at: datetime
+    report_count: int = 1
+
+
+class ComplaintStatusUpdate(BaseModel):
+    status: str = Field(pattern="^(open|escalated|in_progress|resolved)$")
+    solution: Optional[str] = None
 
 
 class FeedbackRequest(BaseModel):
@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+
+from .aggregates import record_sentiments
+from .database import SessionLocal
+from .models import Complaint
+from .nlp.sentiment import SENTIMENT_BATCH_SIZE, classify_sentiments
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_POLL_SECONDS = float(os.getenv("SENTIMENT_POLL_SECONDS", "30"))
+
+
+def score_pending(batch_size: int = SENTIMENT_BATCH_SIZE) -> int:
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Complaint.id, Complaint.text, Complaint.created_at)
+            .filter(Complaint.sentiment.is_(None))
+            .order_by(Complaint.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return 0
+        labels = classify_sentiments([row.text for row in rows], batch_size=batch_size)
+        scored = []
+        for row, label in zip(rows, labels):
+            result = db.execute(
+                update(Complaint)
+                .where(Complaint.id == row.id, Complaint.sentiment.is_(None))
+                .values(sentiment=label)
+                .execution_options(synchronize_session=False)
+            )
+            # Another worker may have scored the row in the meantime; only count our own writes.
+            if result.rowcount:
+                scored.append(((row.created_at or datetime.utcnow()).date(), label))
+        record_sentiments(db, scored)
+        db.commit()
+        return len(rows)
+    finally:
+        db.close()
+
+
+class SentimentScorer:
+    def __init__(self, batch_size: int = SENTIMENT_BATCH_SIZE, poll_seconds: float = SENTIMENT_POLL_SECONDS):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.scored = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sentiment-scorer", daemon=True)
+            self._thread.start()
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                scored = score_pending(self.batch_size)
+            except Exception:
+                logger.exception("Sentiment scoring batch failed")
+                scored = 0
+            self.scored += scored
+            if scored < self.batch_size:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+scorer = SentimentScorer()
@@ -1,20 +1,272 @@
-from dataclasses import dataclass
-from functools import lru_cache
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
-from .nlp.faiss_index import load_or_create_index
-from .nlp.inference import infer_response
+from .database import SessionLocal
+from .nlp.batching import MicroBatcher
+from .nlp.embedder import embed_documents, embed_queries, get_embedding_store
+from .nlp.faiss_index import LiveIndex, load_index
+from .nlp.inference import (
+    compose_response,
+    compose_response_async,
+    get_io_executor,
+    prepare_query,
+    prepare_query_async,
+)
+from .nlp.model_client import ModelClient, get_model_client, remote_enabled
+from .nlp.query_cache import QueryCache
+from .topics import store_embeddings
+
+TOP_K = 5
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+INGEST_MAX_BATCH_SIZE = int(os.getenv("INGEST_MAX_BATCH_SIZE", "64"))
+INGEST_MAX_WAIT_MS = float(os.getenv("INGEST_MAX_WAIT_MS", "200"))
+
+logger = logging.getLogger(__name__)
+_ingest_failures = 0
+_ingest_failures_lock = threading.Lock()
+
+
+def filter_scope(filters: Optional[Dict[str, str]]) -> str:
+    return ";".join(f"{field}={str(value).strip().lower()}" for field, value in sorted((filters or {}).items()) if value)
+
+
+def _watch_ingest(future: Future, record: Dict) -> Future:
+    # Callers fire and forget; without this a failed embed/add/store leaves the complaint silently unsearchable.
+    def done(finished: Future) -> None:
+        global _ingest_failures
+        if finished.cancelled() or finished.exception() is None:
+            return
+        with _ingest_failures_lock:
+            _ingest_failures += 1
+        logger.error(
+            "Ingest of complaint %s failed; it is stored but not searchable",
+            record.get("id"),
+            exc_info=finished.exception(),
+        )
+
+    future.add_done_callback(done)
+    return future
+
+
+class PendingIngests:
+    """Ingest futures by record id, so an update can wait until the record it targets is indexed."""
+
+    def __init__(self):
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def track(self, record: Dict, future: Future) -> Future:
+        key = str(record["id"])
+        with self._lock:
+            self._futures[key] = future
+
+        def done(finished: Future) -> None:
+            with self._lock:
+                if self._futures.get(key) is finished:
+                    del self._futures[key]
+
+        future.add_done_callback(done)
+        return future
+
+    def wait(self, record_id: str) -> None:
+        with self._lock:
+            future = self._futures.get(str(record_id))
+        if future is not None:
+            try:
+                future.result()
+            except Exception:
+                pass  # logged by _watch_ingest; the caller's update then misses and re-ingests the record
 
 
 @dataclass
 class AIState:
     index: object
     records: list
+    live_index: LiveIndex = field(init=False, repr=False)
+    batcher: MicroBatcher = field(init=False, repr=False)
+    ingest_batcher: MicroBatcher = field(init=False, repr=False)
+    cache: QueryCache = field(init=False, repr=False)
+    pending: PendingIngests = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.cache = QueryCache()
+        self.pending = PendingIngests()
+        self.live_index = LiveIndex(self.index, self.records)
+        self.live_index.on_sync = self.cache.invalidate_vectors
+        self.live_index.start_checkpointer()
+        self.batcher = MicroBatcher(
+            self._retrieve_batch,
+            max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=INFERENCE_MAX_WAIT_MS,
+            name="inference-batcher",
+        )
+        self.ingest_batcher = MicroBatcher(
+            self._ingest_batch,
+            max_batch_size=INGEST_MAX_BATCH_SIZE,
+            max_wait_ms=INGEST_MAX_WAIT_MS,
+            name="ingest-batcher",
+        )
+
+    def _retrieve_batch(self, items: List[Tuple[str, str, str, Optional[Dict[str, str]], str]]):
+        """Embed the batch, answer what the semantic cache can, and search the index only for the rest.
+
+        Items are (query, lang, english_query, filters, scope); results are (vector, cached_response, scores, ids)
+        with either the response or the scores and ids set.
+        """
+        vectors = embed_queries([english_query for _, _, english_query, _, _ in items])
+        results: List[Optional[Tuple]] = [None] * len(items)
+        misses = []
+        for i, (query, lang, _, _, scope) in enumerate(items):
+            response = self.cache.get_semantic(query, lang, vectors[i], scope)
+            if response is None:
+                misses.append(i)
+            else:
+                results[i] = (vectors[i], response, None, None)
+        if misses:
+            scores, ids = self.live_index.retrieve(
+                [items[i][2] for i in misses], vectors[misses], top_k=TOP_K, filters=[items[i][3] for i in misses]
+            )
+            for row, i in enumerate(misses):
+                results[i] = (vectors[i], None, scores[row], ids[row])
+        return results
+
+    def _ingest_batch(self, records: List[Dict]):
+        vectors = embed_documents([record["text"] for record in records])
+        positions = self.live_index.add(records, vectors)
+        self.cache.invalidate_vectors(vectors)
+        stored = [(record["complaint_id"], vector) for record, vector in zip(records, vectors) if record.get("complaint_id")]
+        if stored:
+            db = SessionLocal()
+            try:
+                store_embeddings(db, [complaint_id for complaint_id, _ in stored], [vector for _, vector in stored])
+            finally:
+                db.close()
+        return positions
+
+    def run_inference(self, query: str, filters: Optional[Dict[str, str]] = None, with_vector: bool = False):
+        """Answer `query`; with_vector=True also returns its query embedding as (response, vector)."""
+        scope = filter_scope(filters)
+        cached = self.cache.get_exact(query, scope, with_vector=with_vector)
+        if cached is not None:
+            return cached
+        lang, english_query = prepare_query(query)
+        vector, response, scores, ids = self.batcher((query, lang, english_query, filters or None, scope))
+        if response is None:
+            response = compose_response(lang, scores, ids, self.records)
+            self.cache.put(query, lang, vector, scores, ids, response, scope)
+        return (response, vector) if with_vector else response
 
-    def run_inference(self, query: str):
-        return infer_response(query, self.index, self.records)
+    async def run_inference_async(
+        self, query: str, filters: Optional[Dict[str, str]] = None, with_vector: bool = False
+    ):
+        scope = filter_scope(filters)
+        cached = self.cache.get_exact(query, scope, with_vector=with_vector)
+        if cached is not None:
+            return cached
+        lang, english_query = await prepare_query_async(query)
+        item = (query, lang, english_query, filters or None, scope)
+        vector, response, scores, ids = await asyncio.wrap_future(self.batcher.submit(item))
+        if response is None:
+            response = await compose_response_async(lang, scores, ids, self.records)
+            self.cache.put(query, lang, vector, scores, ids, response, scope)
+        return (response, vector) if with_vector else response
+
+    def ingest(self, record: Dict) -> Future:
+        return self.pending.track(record, _watch_ingest(self.ingest_batcher.submit(record), record))
+
+    def update_record(self, record_id: str, **fields) -> bool:
+        # A record still in the ingest batcher is not in the index yet; updating it now would miss, and a
+        # re-ingest with the new fields would be dropped as a duplicate id once the original batch lands.
+        self.pending.wait(record_id)
+        updated = self.live_index.update(record_id, **fields)
+        if updated:
+            self.cache.invalidate_ids([self.live_index.id_map[str(record_id)]])
+        return updated
+
+    def stats(self) -> Dict:
+        store = get_embedding_store()
+        return {
+            "query_cache": self.cache.stats(),
+            "inference_batcher": self.batcher.stats(),
+            "ingest_failures": _ingest_failures,
+            "retrieval": self.live_index.stats(),
+            "embedding_store": store.stats() if store is not None else None,
+        }
+
+    def close(self) -> None:
+        self.ingest_batcher.close()
+        self.batcher.close()
+        self.live_index.close()
+
+
+class RemoteAIState:
+    """AIState stand-in that forwards to the shared model server (MODEL_SERVER_SOCKET)."""
+
+    def __init__(self, client: ModelClient):
+        self.client = client
+        self.pending = PendingIngests()
+        self.client.call("ping")
+
+    def run_inference(self, query: str, filters: Optional[Dict[str, str]] = None, with_vector: bool = False):
+        return self.client.call("run_inference", query, filters, with_vector)
+
+    async def run_inference_async(
+        self, query: str, filters: Optional[Dict[str, str]] = None, with_vector: bool = False
+    ):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_io_executor(), self.client.call, "run_inference", query, filters, with_vector
+        )
+
+    def ingest(self, record: Dict) -> Future:
+        future = _watch_ingest(get_io_executor().submit(self.client.call, "ingest", record), record)
+        return self.pending.track(record, future)
+
+    def update_record(self, record_id: str, **fields) -> bool:
+        # The server only orders calls it has received; an ingest still in this worker's executor comes first.
+        self.pending.wait(record_id)
+        return self.client.call("update_record", record_id, **fields)
+
+    def stats(self) -> Dict:
+        # The server counts ingest failures across all workers; this worker's own count sits under model_client.
+        client_stats = {**self.client.stats(), "ingest_failures": _ingest_failures}
+        return {**self.client.call("stats"), "model_client": client_stats}
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_ai_state: Optional[AIState] = None
+_ai_state_lock = threading.Lock()
 
 
-@lru_cache(maxsize=1)
 def get_ai_state() -> AIState:
-    index, records = load_or_create_index()
-    return AIState(index=index, records=records)
+    # Warmup and request threads may race here; only one of them loads the model and index.
+    global _ai_state
+    if _ai_state is None:
+        with _ai_state_lock:
+            if _ai_state is None:
+                if remote_enabled():
+                    _ai_state = RemoteAIState(get_model_client())
+                else:
+                    index, records = load_index()
+                    _ai_state = AIState(index=index, records=records)
+    return _ai_state
+
+
+def ai_state_loaded() -> bool:
+    return _ai_state is not None
+
+
+def shutdown_ai_state() -> None:
+    global _ai_state
+    with _ai_state_lock:
+        if _ai_state is not None:
+            _ai_state.close()
+            _ai_state = None
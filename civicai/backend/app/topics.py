@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import pickle
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import Complaint, ComplaintEmbedding, TopicState
+from .nlp.embedder import embed_documents
+from .nlp.topic_model import TopicModel
+
+logger = logging.getLogger(__name__)
+
+TOPIC_SYNC_CHUNK = 500
+TOPIC_POLL_SECONDS = float(os.getenv("TOPIC_POLL_SECONDS", "60"))
+STATE_ID = 1
+
+# (version, model) this process last loaded or stored; version 0 is a model not yet in the database.
+_cached: Optional[Tuple[int, TopicModel]] = None
+_cached_lock = threading.Lock()
+
+
+def store_embeddings(db: Session, complaint_ids: Sequence[int], vectors: np.ndarray) -> None:
+    # Ingestion and topic sync can race on the same complaint; either copy of the vector is fine.
+    existing = {
+        complaint_id
+        for (complaint_id,) in db.query(ComplaintEmbedding.complaint_id).filter(
+            ComplaintEmbedding.complaint_id.in_(list(complaint_ids))
+        )
+    }
+    db.add_all(
+        ComplaintEmbedding(complaint_id=complaint_id, vector=np.asarray(vector, dtype="float32").tobytes())
+        for complaint_id, vector in zip(complaint_ids, vectors)
+        if complaint_id not in existing
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def read_topics(db: Session) -> List[Dict]:
+    topics = db.query(TopicState.topics).filter(TopicState.id == STATE_ID).scalar()
+    return json.loads(topics) if topics else []
+
+
+def load_topic_model(db: Session) -> Tuple[int, TopicModel]:
+    """The shared model and its version, unpickled only when another worker stored a newer one."""
+    global _cached
+    version = db.query(TopicState.version).filter(TopicState.id == STATE_ID).scalar() or 0
+    with _cached_lock:
+        if _cached is not None and _cached[0] == version:
+            return _cached
+        if version:
+            row = db.query(TopicState.version, TopicState.model).filter(TopicState.id == STATE_ID).one()
+            _cached = (row.version, pickle.loads(row.model))
+        else:
+            # Seeds from a topic_model.pkl written by earlier releases, if there is one.
+            _cached = (0, TopicModel.load())
+        return _cached
+
+
+def get_topic_model() -> TopicModel:
+    db = SessionLocal()
+    try:
+        return load_topic_model(db)[1]
+    finally:
+        db.close()
+
+
+def update_topic_model(db: Session) -> int:
+    """Feed complaints newer than the shared model into it and store the result; returns complaints added.
+
+    Several workers may run this at once. Only the first to store a given version wins; the others discard
+    their update and continue from the winner's model on their next pass.
+    """
+    global _cached
+    version, model = load_topic_model(db)
+    added = 0
+    with model.lock:
+        while True:
+            rows = (
+                db.query(Complaint.id, Complaint.text)
+                .filter(Complaint.id > model.last_complaint_id)
+                .order_by(Complaint.id)
+                .limit(TOPIC_SYNC_CHUNK)
+                .all()
+            )
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            stored = dict(
+                db.query(ComplaintEmbedding.complaint_id, ComplaintEmbedding.vector).filter(
+                    ComplaintEmbedding.complaint_id.in_(ids)
+                )
+            )
+            missing = [row for row in rows if row.id not in stored]
+            if missing:
+                vectors = embed_documents([row.text for row in missing])
+                store_embeddings(db, [row.id for row in missing], vectors)
+                stored.update((row.id, vector.tobytes()) for row, vector in zip(missing, vectors))
+            matrix = np.stack([np.frombuffer(stored[complaint_id], dtype="float32") for complaint_id in ids])
+            model.update(ids, [row.text for row in rows], matrix)
+            added += len(rows)
+        if not added:
+            return 0
+        values = {
+            "last_complaint_id": model.last_complaint_id,
+            "topics": json.dumps(model.topics(), ensure_ascii=False),
+            "model": pickle.dumps(model),
+        }
+
+    if version:
+        won = (
+            db.query(TopicState)
+            .filter(TopicState.id == STATE_ID, TopicState.version == version)
+            .update({**values, "version": version + 1}, synchronize_session=False)
+        )
+    else:
+        db.add(TopicState(id=STATE_ID, version=1, **values))
+        won = 1
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        won = 0
+    with _cached_lock:
+        # A lost race leaves the in-memory model ahead of the database; reload it next time.
+        _cached = (version + 1, model) if won else None
+    return added if won else 0
+
+
+class TopicUpdater:
+    """Keeps the shared topic model current off the request path; /topics only reads the stored topics."""
+
+    def __init__(self, poll_seconds: float = TOPIC_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.added = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="topic-updater", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                self.added += update_topic_model(db)
+            except Exception:
+                logger.exception("Topic model update failed")
+            finally:
+                db.close()
+            self._stop.wait(self.poll_seconds)
+
+
+topic_updater = TopicUpdater()
@@ -0,0 +1,183 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1.0"))
+WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT", "5"))
+WRITE_BEHIND_RETRIES = 3
+
+
+class WriteBehindBuffer:
+    """Batches append-only inserts (chat history, feedback) into bulk transactions off the request path."""
+
+    def __init__(
+        self,
+        max_size: int = WRITE_BEHIND_QUEUE_SIZE,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_seconds: float = WRITE_BEHIND_FLUSH_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.counters = {
+            "enqueued": 0,
+            "flushed": 0,
+            "batches": 0,
+            "backpressure_waits": 0,
+            "dropped": 0,
+            "failed": 0,
+            "max_queue_depth": 0,
+        }
+        self.last_flush_ms = 0.0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def _enqueued(self) -> None:
+        with self._lock:
+            self.counters["enqueued"] += 1
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], self._queue.qsize())
+
+    def offer(self, model, values: Dict) -> bool:
+        """Queue a row without blocking; False means the buffer is full and the caller should `put`."""
+        values.setdefault("created_at", datetime.utcnow())
+        try:
+            self._queue.put_nowait((model, values))
+        except queue.Full:
+            self._count("backpressure_waits")
+            return False
+        self._enqueued()
+        return True
+
+    def put(self, model, values: Dict, timeout: float = WRITE_BEHIND_PUT_TIMEOUT) -> bool:
+        values.setdefault("created_at", datetime.utcnow())
+        try:
+            self._queue.put((model, values), timeout=timeout)
+        except queue.Full:
+            self._count("dropped")
+            logger.warning("Write-behind buffer full; dropped a %s row", model.__tablename__)
+            return False
+        self._enqueued()
+        return True
+
+    def _collect(self) -> Tuple[List, bool]:
+        items: List = []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(items) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            items.append(item)
+        return items, self._stopping.is_set()
+
+    @staticmethod
+    def _insert(items: List) -> None:
+        grouped = defaultdict(list)
+        for model, values in items:
+            grouped[model].append(values)
+        db = SessionLocal()
+        try:
+            for model, rows in grouped.items():
+                db.execute(insert(model), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _salvage(self, items: List) -> int:
+        """Bisect a batch that keeps failing so only the rows that cannot be written are lost; returns rows written."""
+        written = 0
+        middle = len(items) // 2
+        for half in (items[:middle], items[middle:]):
+            if not half:
+                continue
+            try:
+                self._insert(half)
+                written += len(half)
+            except Exception:
+                if len(half) > 1:
+                    written += self._salvage(half)
+                    continue
+                model, values = half[0]
+                logger.exception("Write-behind dropped a %s row: %r", model.__tablename__, values)
+                self._count("failed")
+        return written
+
+    def _flush(self, items: List) -> None:
+        start = time.perf_counter()
+        for attempt in range(1, WRITE_BEHIND_RETRIES + 1):
+            try:
+                self._insert(items)
+                written = len(items)
+                break
+            except Exception:
+                if attempt == WRITE_BEHIND_RETRIES:
+                    # One bad row (e.g. a constraint violation) must not take the rest of the batch with it.
+                    logger.warning("Write-behind flush of %d rows failed; retrying them in smaller batches", len(items))
+                    written = self._salvage(items)
+                    break
+                time.sleep(0.1 * attempt)
+        self._count("flushed", written)
+        self._count("batches")
+        self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            items, stopping = self._collect()
+            if items:
+                self._flush(items)
+        # Drain whatever arrived before stop() was called.
+        while True:
+            items = []
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not items:
+                return
+            self._flush(items)
+
+    def stop(self, timeout: float = 30) -> None:
+        if self._thread is None:
+            return
+        # A flag rather than a queued sentinel: a full queue must not block shutdown.
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            pending = self._queue.qsize()
+            logger.warning("Write-behind buffer did not drain within %.0fs; %d rows pending", timeout, pending)
+        self._thread = None
+
+    def stats(self) -> Dict:
+        return {**self.counters, "queue_depth": self._queue.qsize(), "last_flush_ms": self.last_flush_ms}
+
+
+write_buffer = WriteBehindBuffer()
@@ -0,0 +1,65 @@
+import argparse
+import time
+from typing import Callable, List
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from app.auth import create_access_token, decode_token, get_current_claims, require_role, token_cache
+
+
+def _per_call_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure per-request authentication overhead.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12], help="bcrypt costs to time for login")
+    args = parser.parse_args(argv)
+
+    token = create_access_token({"sub": "bench", "role": "admin", "user_id": 1})
+    print(f"{'operation':34} {'us/op':>10}")
+    print(f"{'jwt decode + verify':34} {_per_call_us(lambda: decode_token(token), args.iterations):10.1f}")
+    token_cache.put(token, decode_token(token))
+    print(f"{'token cache hit':34} {_per_call_us(lambda: token_cache.get(token), args.iterations):10.1f}")
+
+    app = FastAPI()
+
+    @app.get("/open")
+    def open_route():
+        return {}
+
+    @app.get("/claims", dependencies=[Depends(get_current_claims)])
+    def claims_route():
+        return {}
+
+    @app.get("/admin", dependencies=[Depends(require_role("admin"))])
+    def admin_route():
+        return {}
+
+    headers = {"Authorization": f"Bearer {token}"}
+    with TestClient(app) as client:
+        baseline = _per_call_us(lambda: client.get("/open"), args.iterations)
+        print(f"{'request without auth':34} {baseline:10.1f}")
+        for path in ("/claims", "/admin"):
+            cached = _per_call_us(lambda: client.get(path, headers=headers), args.iterations)
+            print(f"{'request ' + path + ' (cached token)':34} {cached:10.1f}  (+{cached - baseline:.1f})")
+        token_cache.max_size = 0
+        token_cache._entries.clear()
+        uncached = _per_call_us(lambda: client.get("/claims", headers=headers), args.iterations)
+        print(f"{'request /claims (no cache)':34} {uncached:10.1f}  (+{uncached - baseline:.1f})")
+
+    for rounds in args.rounds:
+        context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+        hashed = context.hash("benchmark-password")
+        print(f"{f'bcrypt verify (rounds={rounds})':34} {_per_call_us(lambda: context.verify('benchmark-password', hashed), 5):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from app.nlp.embedder import BACKENDS, EMBEDDING_MODEL, encode, load_embedder
+from app.nlp.faiss_index import DATA_FILE, PARITY_FILE, frame_records
+
+
+def _sample_texts(count: int, seed: int) -> List[str]:
+    texts = [record["text"] for record in frame_records(pd.read_csv(DATA_FILE))]
+    texts = list(dict.fromkeys(texts))
+    order = np.random.default_rng(seed).permutation(len(texts))[:count]
+    return [texts[i] for i in order]
+
+
+def _timed_encode(model, texts: List[str], prefix: str, batch_size: int):
+    encode(model, texts[:batch_size], prefix)
+    start = time.perf_counter()
+    vectors = np.concatenate([encode(model, texts[i : i + batch_size], prefix) for i in range(0, len(texts), batch_size)])
+    return vectors, time.perf_counter() - start
+
+
+def _recall(truth: np.ndarray, found: np.ndarray) -> float:
+    return sum(len(set(t) & set(f)) for t, f in zip(truth, found)) / truth.size
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check embedding backends for parity with the index vectors and measure throughput.")
+    parser.add_argument("--backends", nargs="+", default=[name for name in BACKENDS if name != "torch"], choices=list(BACKENDS))
+    parser.add_argument("--reference", default="torch", choices=list(BACKENDS), help="backend the index was built with")
+    parser.add_argument("--samples", type=int, default=1000, help="corpus texts embedded by every backend")
+    parser.add_argument("--queries", type=int, default=200, help="sampled texts reused as retrieval queries")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-write", action="store_true", help=f"do not record results in {PARITY_FILE.name}")
+    args = parser.parse_args(argv)
+
+    import torch
+
+    torch.set_num_threads(args.threads)
+    faiss.omp_set_num_threads(args.threads)
+    texts = _sample_texts(args.samples, args.seed)
+    queries = texts[: args.queries]
+
+    reference = load_embedder(args.reference)
+    ref_docs, ref_seconds = _timed_encode(reference, texts, "passage", args.batch_size)
+    ref_queries = encode(reference, queries, "query")
+    index = faiss.IndexFlatIP(ref_docs.shape[1])
+    index.add(ref_docs)
+    _, truth = index.search(ref_queries, args.top_k + 1)
+    del reference
+
+    results: Dict[str, Dict] = {}
+    print(f"{'backend':12} {'mean_cos':>9} {'min_cos':>9} {'recall':>8} {'texts/s/core':>13} {'speedup':>8}")
+    print(f"{args.reference:12} {1.0:9.4f} {1.0:9.4f} {1.0:8.3f} {len(texts) / ref_seconds / args.threads:13.1f} {1.0:8.2f}")
+    for backend in args.backends:
+        model = load_embedder(backend)
+        docs, seconds = _timed_encode(model, texts, "passage", args.batch_size)
+        cosine = (docs * ref_docs).sum(axis=1)
+        # Candidate queries against reference passages is exactly what serving on an old index does.
+        _, found = index.search(encode(model, queries, "query"), args.top_k + 1)
+        recall = _recall(truth, found)
+        results[backend] = {
+            "model": EMBEDDING_MODEL,
+            "reference": args.reference,
+            "mean_cosine": round(float(cosine.mean()), 5),
+            "min_cosine": round(float(cosine.min()), 5),
+            "recall": round(recall, 4),
+            "texts_per_sec_per_core": round(len(texts) / seconds / args.threads, 2),
+            "compatible": bool(cosine.mean() >= args.min_cosine and recall >= args.min_recall),
+        }
+        row = results[backend]
+        print(
+            f"{backend:12} {row['mean_cosine']:9.4f} {row['min_cosine']:9.4f} {recall:8.3f} "
+            f"{row['texts_per_sec_per_core']:13.1f} {ref_seconds / seconds:8.2f}"
+        )
+        del model
+
+    for backend, row in results.items():
+        if not row["compatible"]:
+            print(f"{backend}: below parity; rebuild with EMBEDDING_BACKEND={backend} python -m scripts.ingest_corpus --force")
+
+    if not args.no_write:
+        recorded = json.loads(PARITY_FILE.read_text()) if PARITY_FILE.exists() else {}
+        recorded.update(results)
+        PARITY_FILE.write_text(json.dumps(recorded, indent=2))
+        print(f"recorded parity in {PARITY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from app.nlp.faiss_index import FLAT_INDEX_FILE, INDEX_TYPES, VECTORS_FILE, configure_search, create_index
+
+
+def _load_vectors(limit: int) -> np.ndarray:
+    if VECTORS_FILE.exists():
+        vectors = np.load(VECTORS_FILE, mmap_mode="r")
+        return np.ascontiguousarray(vectors[:limit] if limit else vectors, dtype="float32")
+    if not FLAT_INDEX_FILE.exists():
+        raise SystemExit(f"No saved vectors at {VECTORS_FILE}; run python -m scripts.ingest_corpus first.")
+    flat = faiss.read_index(str(FLAT_INDEX_FILE))
+    n_vectors = min(flat.ntotal, limit) if limit else flat.ntotal
+    return flat.reconstruct_n(0, n_vectors)
+
+
+def _recall(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+def _bench(index: faiss.Index, queries: np.ndarray, top_k: int, truth: np.ndarray) -> Dict:
+    index.search(queries[:8], top_k)
+    start = time.perf_counter()
+    for row in queries:
+        index.search(row[None, :], top_k)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, ids = index.search(queries, top_k)
+    batched = time.perf_counter() - start
+
+    return {
+        "recall": _recall(truth, ids),
+        "qps": len(queries) / single,
+        "batch_qps": len(queries) / batched,
+        "memory_mb": faiss.serialize_index(index).nbytes / 1e6,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare FAISS index modes against the flat baseline.")
+    parser.add_argument("--modes", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--queries", type=int, default=500, help="held-out corpus vectors used as queries")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=0, help="cap the corpus size (0 = all)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    faiss.omp_set_num_threads(args.threads)
+    vectors = _load_vectors(args.limit)
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[order[: args.queries]])
+    corpus = np.ascontiguousarray(vectors[order[args.queries :]])
+    print(f"corpus={len(corpus)} queries={len(queries)} dim={corpus.shape[1]} top_k={args.top_k} threads={args.threads}")
+
+    baseline = create_index(corpus, index_type="flat")
+    _, truth = baseline.search(queries, args.top_k)
+
+    header = f"{'mode':<10} {'param':<14} {'build_s':>8} {f'recall@{args.top_k}':>9} {'qps':>9} {'batch_qps':>10} {'mem_mb':>8}"
+    print(header)
+    print("-" * len(header))
+    for mode in args.modes:
+        start = time.perf_counter()
+        index = create_index(corpus, index_type=mode)
+        build = time.perf_counter() - start
+
+        if mode.startswith("ivf"):
+            settings = [(f"nprobe={n}", {"nprobe": n}) for n in args.nprobe]
+        elif mode == "hnsw":
+            settings = [(f"efSearch={ef}", {"ef_search": ef}) for ef in args.ef_search]
+        else:
+            settings = [("-", {})]
+
+        for label, params in settings:
+            configure_search(index, **params)
+            row = _bench(index, queries, args.top_k, truth)
+            print(
+                f"{mode:<10} {label:<14} {build:>8.2f} {row['recall']:>9.3f} "
+                f"{row['qps']:>9.0f} {row['batch_qps']:>10.0f} {row['memory_mb']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
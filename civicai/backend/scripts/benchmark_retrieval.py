@@ -0,0 +1,95 @@
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.nlp.embedder import embed_queries
+from app.nlp.faiss_index import LiveIndex, load_index
+from app.nlp.lexical import tokenize
+
+
+def _queries(live: LiveIndex, sample: List[int], kind: str, rng: np.random.Generator) -> List[str]:
+    lexical = live._lexical_index()
+    queries = []
+    for pos in sample:
+        tokens = tokenize(live.records.field(pos, "text"))
+        if kind == "keywords":
+            # Ward/road names and ticket terms: the record's rarest words, the case dense retrieval tends to miss.
+            rare = sorted(set(tokens), key=lexical.document_frequency)[:3]
+            queries.append(" ".join(rare))
+        else:
+            width = max(3, int(len(tokens) * 0.6))
+            start = int(rng.integers(0, max(1, len(tokens) - width + 1)))
+            queries.append(" ".join(tokens[start : start + width]))
+    return queries
+
+
+def _run(
+    live: LiveIndex,
+    queries: List[str],
+    vectors: np.ndarray,
+    targets: List[int],
+    mode: str,
+    top_k: int,
+    filters: Optional[List[Dict]],
+) -> Dict:
+    latencies, hits, reciprocal = [], 0, 0.0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        query_filters = [filters[i]] if filters else None
+        _, ids = live.retrieve([query], vectors[i : i + 1], top_k=top_k, mode=mode, filters=query_filters)
+        latencies.append(time.perf_counter() - start)
+        found = list(ids[0])
+        if targets[i] in found:
+            hits += 1
+            reciprocal += 1.0 / (found.index(targets[i]) + 1)
+    ms = np.array(latencies) * 1000
+    return {
+        "recall": hits / len(queries),
+        "mrr": reciprocal / len(queries),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare dense-only and hybrid (BM25 + dense) retrieval.")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument(
+        "--filter",
+        choices=["none", "location", "department"],
+        default="none",
+        help="restrict each query to its target's location or department",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    index, records = load_index()
+    live = LiveIndex(index, records)
+    start = time.perf_counter()
+    live._lexical_index()
+    print(f"corpus={len(live)} bm25_build_s={time.perf_counter() - start:.2f} top_k={args.top_k} filter={args.filter}")
+
+    rng = np.random.default_rng(args.seed)
+    sample = [int(pos) for pos in rng.choice(len(live), size=min(args.queries, len(live)), replace=False)]
+    filters = None
+    if args.filter != "none":
+        filters = [{args.filter: records.field(pos, args.filter)} for pos in sample]
+        share = np.mean([live._filter_mask(live._filter_key(f)).mean() for f in filters])
+        print(f"average filtered share of corpus: {share:.1%}")
+
+    header = f"{'queries':10} {'mode':7} {f'recall@{args.top_k}':>9} {'mrr':>6} {'p50_ms':>8} {'p95_ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for kind in ("keywords", "passage"):
+        queries = _queries(live, sample, kind, rng)
+        vectors = embed_queries(queries)
+        for mode in ("dense", "hybrid"):
+            row = _run(live, queries, vectors, sample, mode, args.top_k, filters)
+            print(f"{kind:10} {mode:7} {row['recall']:9.3f} {row['mrr']:6.3f} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
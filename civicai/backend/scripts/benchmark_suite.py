@@ -0,0 +1,310 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import resource
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+SOURCE_CSV = Path(__file__).resolve().parents[1] / "data" / "bbmp_reddit_data.csv"
+# Offline translation and small models, so a run needs no network calls beyond the first model download.
+SMALL_PROFILE = {
+    "TRANSLATION_BACKEND": "offline",
+    "EMBEDDING_MODEL": "intfloat/e5-small-v2",
+    "EMBEDDING_BACKEND": "torch",
+    "SENTIMENT_MODEL": "lxyuan/distilbert-base-multilingual-cased-sentiments-student",
+    "EMBEDDING_STORE": "0",
+}
+WARDS = ("Jayanagar", "Koramangala", "Indiranagar", "Whitefield", "Malleshwaram", "HSR Layout", "Yelahanka", "Hebbal")
+COLUMNS = (
+    f"{'benchmark':28} {'calls':>6} {'errors':>6} {'per_s':>9} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'rss_mb':>8}"
+)
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 / 1e6
+
+
+def _summarize(name: str, latencies: Sequence[float], elapsed: float, items: int, errors: int = 0) -> Dict:
+    ms = np.array(latencies or [0.0]) * 1000
+    return {
+        "name": name,
+        "calls": len(latencies),
+        "errors": errors,
+        "per_s": items / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rss_mb": _rss_mb(),
+    }
+
+
+def _print(row: Dict) -> None:
+    print(
+        f"{row['name']:28} {row['calls']:6d} {row['errors']:6d} {row['per_s']:9.1f} "
+        f"{row['p50_ms']:8.2f} {row['p95_ms']:8.2f} {row['p99_ms']:8.2f} {row['rss_mb']:8.0f}",
+        flush=True,
+    )
+
+
+def _time_calls(name: str, fn: Callable, args: Sequence, items_per_call: int = 1) -> Dict:
+    fn(args[0])
+    latencies = []
+    start = time.perf_counter()
+    for arg in args:
+        call_start = time.perf_counter()
+        fn(arg)
+        latencies.append(time.perf_counter() - call_start)
+    row = _summarize(name, latencies, time.perf_counter() - start, len(args) * items_per_call)
+    _print(row)
+    return row
+
+
+def _sample_texts(rows: int, seed: int) -> List[str]:
+    texts = pd.read_csv(SOURCE_CSV, usecols=["text"])["text"].dropna().astype(str)
+    texts = texts[texts.str.strip() != ""].drop_duplicates()
+    return texts.sample(n=min(rows, len(texts)), random_state=seed).tolist()
+
+
+def prepare(workdir: Path, corpus: List[str], profile: str) -> None:
+    """Point every data path at `workdir` and build the index there; must run before any app import."""
+    if profile == "small":
+        for name, value in SMALL_PROFILE.items():
+            os.environ.setdefault(name, value)
+    os.environ["DATA_DIR"] = str(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'benchmark.db'}"
+    os.environ["AUTH_REQUIRED"] = "0"
+    source = workdir / "corpus.csv"
+    pd.DataFrame({"text": corpus}).to_csv(source, index=False)
+
+    from scripts.ingest_corpus import main as ingest_corpus
+
+    ingest_corpus(["--source", str(source), "--workers", "1"])
+
+
+def micro_benchmarks(texts: List[str], iterations: int, batch_size: int) -> List[Dict]:
+    from app.nlp.embedder import embed_documents, embed_queries, embed_query
+    from app.nlp.faiss_index import search
+    from app.nlp.sentiment import analyze_sentiments
+    from app.state import get_ai_state
+
+    live = get_ai_state().live_index
+    queries = [texts[i % len(texts)] for i in range(iterations)]
+    batches = [
+        [texts[(i * batch_size + j) % len(texts)] for j in range(batch_size)]
+        for i in range(max(2, iterations // batch_size))
+    ]
+    vectors = embed_queries(queries)
+    positions = list(range(len(queries)))
+
+    def hybrid(i: int):
+        return live.retrieve([queries[i]], vectors[i : i + 1], mode="hybrid")
+
+    return [
+        _time_calls("embed_query", embed_query, queries),
+        _time_calls(f"embed_documents (x{batch_size})", embed_documents, batches, batch_size),
+        _time_calls("search", lambda i: search(live.index, vectors[i], top_k=5), positions),
+        _time_calls("search (hybrid)", hybrid, positions),
+        _time_calls(f"analyze_sentiments (x{batch_size})", analyze_sentiments, batches, batch_size),
+    ]
+
+
+class _Http:
+    """One keep-alive connection per load-generator thread."""
+
+    def __init__(self, base_url: str, token: str = ""):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> int:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=self.headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def _scenarios(texts: List[str]) -> List[Tuple[str, Callable[[random.Random], Tuple[str, str, Optional[Dict]]]]]:
+    return [
+        ("POST /chat", lambda rng: ("POST", "/chat", {"user_id": 1, "message": rng.choice(texts)})),
+        (
+            "POST /complaint",
+            lambda rng: (
+                "POST",
+                "/complaint",
+                {"user_id": 1, "text": rng.choice(texts), "location": rng.choice(WARDS)},
+            ),
+        ),
+        ("GET /analytics", lambda rng: ("GET", "/analytics?days=30", None)),
+        ("GET /topics", lambda rng: ("GET", "/topics", None)),
+        ("GET /alerts", lambda rng: ("GET", "/alerts?window=24h", None)),
+    ]
+
+
+def api_load(
+    base_url: str, texts: List[str], requests: int, concurrency: int, seed: int, token: str = ""
+) -> List[Dict]:
+    client = _Http(base_url, token)
+    rows = []
+    for name, make in _scenarios(texts):
+        rng = random.Random(seed)
+        calls = [make(rng) for _ in range(requests)]
+        latencies: List[float] = []
+        errors = 0
+        lock = threading.Lock()
+
+        def one(call):
+            nonlocal errors
+            start = time.perf_counter()
+            try:
+                ok = client.request(*call) < 400
+            except (OSError, http.client.HTTPException):
+                ok = False
+            with lock:
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(one, calls))
+        row = _summarize(name, latencies, time.perf_counter() - start, len(latencies), errors)
+        _print(row)
+        rows.append(row)
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port: int):
+    import uvicorn
+
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="benchmark-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("benchmark server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def wait_ready(base_url: str, timeout: float) -> None:
+    client = _Http(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if client.request("GET", "/health/ready") == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"{base_url} not ready after {timeout:.0f}s")
+
+
+def compare(rows: List[Dict], baseline_file: Path, tolerance: float) -> List[str]:
+    baseline = {row["name"]: row for row in json.loads(baseline_file.read_text())["results"]}
+    regressions = []
+    for row in rows:
+        before = baseline.get(row["name"])
+        if before and before["p95_ms"] > 0 and row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{row['name']}: p95 {before['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms")
+    return regressions
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the API and micro-benchmark the NLP hot paths.")
+    parser.add_argument(
+        "--profile",
+        choices=["small", "configured"],
+        default="small",
+        help="small: offline translation and small models; configured: the current environment",
+    )
+    parser.add_argument("--corpus", type=int, default=2000, help="CSV rows indexed for the run")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per micro-benchmark")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=300, help="requests per API endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", default="", help="load-test a running instance; skips local setup and micro-benchmarks")
+    parser.add_argument("--token", default="", help="bearer token for --url instances with AUTH_REQUIRED=1")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--ready-timeout", type=float, default=900)
+    parser.add_argument("--output", default="", help="write results as JSON")
+    parser.add_argument("--baseline", default="", help="earlier --output file; exit 1 if any p95 regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown against --baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    texts = _sample_texts(args.corpus + args.iterations, args.seed)
+    corpus, queries = texts[: args.corpus], texts[args.corpus :] or texts
+    rows: List[Dict] = []
+    with tempfile.TemporaryDirectory(prefix="civicai-bench-") as tmp:
+        base_url = args.url
+        if not base_url:
+            prepare(Path(tmp), corpus, args.profile)
+            model = os.getenv("EMBEDDING_MODEL", "default")
+            print(f"profile={args.profile} corpus={len(corpus)} model={model} rss_mb={_rss_mb():.0f}")
+            if not args.skip_micro:
+                print(COLUMNS)
+                rows += micro_benchmarks(queries, args.iterations, args.batch_size)
+            if not args.skip_api:
+                base_url = f"http://127.0.0.1:{_free_port()}"
+                server, thread = serve(int(base_url.rsplit(":", 1)[1]))
+        if base_url and not args.skip_api:
+            wait_ready(base_url, args.ready_timeout)
+            print(f"\nAPI {base_url} requests={args.requests} concurrency={args.concurrency}")
+            print(COLUMNS)
+            rows += api_load(base_url, queries, args.requests, args.concurrency, args.seed, args.token)
+            if not args.url:
+                server.should_exit = True
+                thread.join(timeout=30)
+    print(f"\npeak_rss_mb={_peak_rss_mb():.0f}")
+
+    if args.output:
+        report = {"profile": args.profile, "results": rows, "peak_rss_mb": _peak_rss_mb()}
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        regressions = compare(rows, Path(args.baseline), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
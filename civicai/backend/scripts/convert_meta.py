@@ -0,0 +1,21 @@
+import argparse
+import time
+from typing import List
+
+from app.nlp.faiss_index import META_FILE, STORE_DIR
+from app.nlp.record_store import convert_json
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert grievance_meta.json into the memory-mapped record store.")
+    parser.add_argument("--source", default=str(META_FILE))
+    parser.add_argument("--target", default=str(STORE_DIR))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = convert_json(args.source, args.target)
+    print(f"wrote {len(store)} records to {args.target} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Set
+
+import numpy as np
+import pandas as pd
+
+from app.nlp.embedder import embedding_signature
+from app.nlp.faiss_index import (
+    DATA_DIR,
+    DATA_FILE,
+    EMBEDDING_META_FILE,
+    INDEX_TYPE,
+    INDEX_TYPES,
+    STORE_DIR,
+    VECTORS_FILE,
+    create_index,
+    frame_records,
+    index_file_for,
+    write_embedding_meta,
+    write_index,
+)
+from app.nlp.model_client import serve_locally
+from app.nlp.record_store import RecordStore
+
+SHARD_DIR = DATA_DIR / "ingest"
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "2000"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, writer) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        writer(handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def _shard_paths(shard: int):
+    return SHARD_DIR / f"shard_{shard:05d}.npy", SHARD_DIR / f"shard_{shard:05d}.json"
+
+
+def _init_worker(threads: int) -> None:
+    import torch
+
+    torch.set_num_threads(threads)
+    serve_locally()
+
+
+def _embed_shard(shard: int, records: List[Dict]) -> int:
+    from app.nlp.embedder import embed_documents
+
+    vectors_path, records_path = _shard_paths(shard)
+    vectors = embed_documents([record["text"] for record in records]) if records else np.zeros((0, 0), dtype="float32")
+    _write_atomic(vectors_path, lambda handle: np.save(handle, vectors))
+    # The records file doubles as the done-marker, so it is written last.
+    _write_atomic(records_path, lambda handle: handle.write(json.dumps(records, ensure_ascii=False).encode("utf-8")))
+    return len(records)
+
+
+def _load_shard(shard: int):
+    vectors_path, records_path = _shard_paths(shard)
+    with open(records_path, encoding="utf-8") as handle:
+        records = json.load(handle)
+    return records, np.load(vectors_path)
+
+
+def _source_fingerprint(source: Path, chunk_size: int) -> Dict:
+    stat = source.stat()
+    return {
+        "source": str(source.resolve()),
+        "size": stat.st_size,
+        "mtime": int(stat.st_mtime),
+        "chunk_size": chunk_size,
+        **embedding_signature(),
+    }
+
+
+def _prepare_shard_dir(fingerprint: Dict, restart: bool) -> None:
+    manifest_path = SHARD_DIR / "manifest.json"
+    if restart and SHARD_DIR.exists():
+        shutil.rmtree(SHARD_DIR)
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    if manifest_path.exists():
+        previous = json.loads(manifest_path.read_text())
+        if previous != fingerprint:
+            raise SystemExit(f"Shards in {SHARD_DIR} were built from a different source or settings; rerun with --restart.")
+        return
+    manifest_path.write_text(json.dumps(fingerprint, indent=2))
+
+
+def _completed_shards() -> Set[int]:
+    return {int(path.stem.split("_")[1]) for path in SHARD_DIR.glob("shard_*.json")}
+
+
+def embed_corpus(source: Path, chunk_size: int, workers: int, restart: bool = False) -> int:
+    _prepare_shard_dir(_source_fingerprint(source, chunk_size), restart)
+    done = _completed_shards()
+    seen: Set[str] = set()
+    for shard in sorted(done):
+        seen.update(_text_key(record["text"]) for record in _load_shard(shard)[0])
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    submitted = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = []
+        for shard, chunk in enumerate(pd.read_csv(source, chunksize=chunk_size)):
+            if shard in done:
+                continue
+            records = []
+            for record in frame_records(chunk):
+                key = _text_key(record["text"])
+                if key in seen:
+                    skipped += 1
+                    continue
+                seen.add(key)
+                records.append(record)
+            futures.append(pool.submit(_embed_shard, shard, records))
+            submitted += 1
+        for future in futures:
+            future.result()
+    print(f"embedded {submitted} new shards ({len(done)} resumed, {skipped} duplicate texts skipped)")
+    return submitted
+
+
+def _live_records(corpus_ids: Set[str]) -> List[Dict]:
+    """Rows the API appended to the current store after the last build, i.e. complaints ingested live.
+
+    The saved corpus vectors mark where the previous build's rows end; without them every row the new corpus
+    does not contain is kept, so no complaint is lost.
+    """
+    if not RecordStore.exists(STORE_DIR):
+        return []
+    store = RecordStore(STORE_DIR)
+    start = min(len(np.load(VECTORS_FILE, mmap_mode="r")), len(store)) if VECTORS_FILE.exists() else 0
+    return [dict(store[pos]) for pos in range(start, len(store)) if str(store[pos]["id"]) not in corpus_ids]
+
+
+def merge_shards(index_type: str, replace: bool = False) -> None:
+    shards = sorted(_completed_shards())
+    records, vectors = [], []
+    for shard in shards:
+        shard_records, shard_vectors = _load_shard(shard)
+        if shard_records:
+            records.extend(shard_records)
+            vectors.append(shard_vectors)
+    if not records:
+        raise SystemExit("No records to index; check the source CSV.")
+    matrix = np.ascontiguousarray(np.concatenate(vectors), dtype="float32")
+    # Must run before VECTORS_FILE is overwritten. The index covers the corpus only; the API embeds the
+    # carried-over rows when it loads a store longer than the index.
+    live = [] if replace else _live_records({str(record["id"]) for record in records})
+
+    _write_atomic(VECTORS_FILE, lambda handle: np.save(handle, matrix))
+    write_embedding_meta(matrix.shape[1])
+    staging = STORE_DIR.with_name(STORE_DIR.name + ".staging")
+    if staging.exists():
+        shutil.rmtree(staging)
+    RecordStore.create(staging, records + live)
+    # The store must never be shorter than the index, so swap it in before the index.
+    retired = STORE_DIR.with_name(STORE_DIR.name + ".old")
+    if STORE_DIR.exists():
+        os.replace(STORE_DIR, retired)
+    os.replace(staging, STORE_DIR)
+    shutil.rmtree(retired, ignore_errors=True)
+    build_index(index_type, matrix)
+    print(f"merged {len(shards)} shards into {len(records)} records, kept {len(live)} live complaints")
+
+
+def build_index(index_type: str, vectors: np.ndarray = None) -> None:
+    if vectors is None:
+        if not VECTORS_FILE.exists():
+            raise SystemExit(f"{VECTORS_FILE} missing; run a full ingestion first.")
+        vectors = np.load(VECTORS_FILE)
+    start = time.perf_counter()
+    index = create_index(vectors, index_type=index_type)
+    write_index(index, index_file_for(index_type))
+    print(f"built {index_type} index over {index.ntotal} vectors in {time.perf_counter() - start:.1f}s")
+
+
+def _up_to_date(source: Path, index_type: str) -> bool:
+    artifacts = [VECTORS_FILE, EMBEDDING_META_FILE, index_file_for(index_type), STORE_DIR / "manifest.json"]
+    if not all(path.exists() for path in artifacts):
+        return False
+    built = json.loads(EMBEDDING_META_FILE.read_text())
+    if any(built.get(key) != value for key, value in embedding_signature().items()):
+        return False
+    return min(path.stat().st_mtime for path in artifacts) >= source.stat().st_mtime
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Embed the grievance corpus offline and build the search artifacts.")
+    parser.add_argument("--source", default=str(DATA_FILE))
+    parser.add_argument("--index-type", default=INDEX_TYPE, choices=INDEX_TYPES)
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    parser.add_argument("--restart", action="store_true", help="discard existing shards and embed from scratch")
+    parser.add_argument("--reindex", action="store_true", help="rebuild the index from saved vectors without embedding")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the artifacts are newer than the source")
+    parser.add_argument("--keep-shards", action="store_true")
+    parser.add_argument(
+        "--replace", action="store_true", help="drop complaints ingested live through the API instead of keeping them"
+    )
+    args = parser.parse_args(argv)
+
+    source = Path(args.source)
+    if args.reindex:
+        build_index(args.index_type)
+        return
+    if not (args.force or args.restart) and _up_to_date(source, args.index_type):
+        print("artifacts are up to date; use --force to rebuild")
+        return
+
+    start = time.perf_counter()
+    embed_corpus(source, args.chunk_size, args.workers, restart=args.restart)
+    merge_shards(args.index_type, replace=args.replace)
+    if not args.keep_shards:
+        shutil.rmtree(SHARD_DIR)
+    print(f"ingestion finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
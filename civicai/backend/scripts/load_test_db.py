@@ -0,0 +1,114 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.aggregates import record_complaint
+from app.database import Base, create_db_engine
+from app.models import ChatHistory, Complaint, User
+
+# (name, tuned engine, single transaction): each row changes one thing relative to the row above it.
+PROFILES: List[Tuple[str, bool, bool]] = [
+    ("baseline", False, False),
+    ("tuned", True, False),
+    ("tuned+1tx", True, True),
+]
+
+
+def _escalation(db, single_transaction: bool) -> None:
+    # Mirrors the chat escalation path: complaint + aggregate upsert + chat log.
+    complaint = Complaint(
+        ticket_id=f"CIV-{uuid.uuid4().hex[:10].upper()}",
+        user_id=1,
+        text="Auto-escalated from chat",
+        department="Escalation Desk",
+        status="escalated",
+        sla_hours=48,
+        severity="high",
+    )
+    db.add(complaint)
+    record_complaint(db, complaint)
+    if not single_transaction:
+        db.commit()
+    db.add(ChatHistory(user_id=1, query="NOT SOLVED", response="Issue escalated.", confidence=0.99))
+    db.commit()
+
+
+def run_profile(url: str, name: str, tuned: bool, single_transaction: bool, workers: int, requests: int) -> Dict:
+    engine = create_db_engine(url, tuned=tuned)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add(User(id=1, username="loadtest", email="loadtest@civicai.local", hashed_password="x"))
+        db.commit()
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        db = Session()
+        start = time.perf_counter()
+        try:
+            _escalation(db, single_transaction=single_transaction)
+        except OperationalError:
+            db.rollback()
+            with lock:
+                errors += 1
+            return
+        finally:
+            db.close()
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    ms = np.array(latencies or [0.0]) * 1000
+    return {
+        "profile": name,
+        "ok": len(latencies),
+        "errors": errors,
+        "writes_per_sec": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare write throughput of the default and tuned database profiles.")
+    parser.add_argument("--url", default="", help="database URL (default: a throwaway SQLite file)")
+    parser.add_argument(
+        "--drop-tables", action="store_true", help="confirm that every table at --url may be dropped and recreated"
+    )
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+    if args.url and not args.drop_tables:
+        parser.error("--url drops and recreates every table in that database; pass --drop-tables to confirm")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'profile':10} {'ok':>6} {'errors':>7} {'writes/s':>9} {'p50_ms':>8} {'p95_ms':>8}")
+        for name, tuned, single_transaction in PROFILES:
+            # WAL mode persists in the SQLite file, so each profile gets its own.
+            url = args.url or f"sqlite:///{os.path.join(tmp, f'loadtest_{name}.db')}"
+            row = run_profile(url, name, tuned, single_transaction, args.workers, args.requests)
+            print(
+                f"{row['profile']:10} {row['ok']:6d} {row['errors']:7d} {row['writes_per_sec']:9.1f} "
+                f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "sklearn", "pandas", "googletrans")
+
+
+def _import_times(module: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode:
+        raise SystemExit(result.stderr[-2000:])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return wall, rows
+
+
+def _warmup_times() -> Dict[str, float]:
+    from app.health import warmup
+
+    timings = {}
+    for name, loader in warmup.loaders.items():
+        start = time.perf_counter()
+        loader()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Report import-time cost of the API and the background model warmup.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--warmup", action="store_true", help="also time each warmup component")
+    args = parser.parse_args(argv)
+
+    wall, rows = _import_times(args.module)
+    imported = {name.strip() for _, _, name in rows}
+    print(f"import {args.module}: {wall:.2f}s wall (interpreter start included)")
+    print(f"{'module':50} {'self_ms':>9} {'cumul_ms':>9}")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[: args.top]:
+        print(f"{name[:50]:50} {self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}")
+    loaded = [name for name in HEAVY_MODULES if name in imported]
+    print(f"heavy modules imported eagerly: {', '.join(loaded) or 'none'}")
+
+    if args.warmup:
+        for name, seconds in _warmup_times().items():
+            print(f"warmup {name:12} {seconds:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
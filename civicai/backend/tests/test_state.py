@@ -0,0 +1,56 @@
+import zlib
+
+import faiss
+import numpy as np
+import pytest
+
+from app import state
+from app.nlp import faiss_index
+from app.nlp.record_store import RecordStore
+
+DIM = 8
+
+
+def _embed(texts):
+    vectors = np.stack([np.random.default_rng(zlib.crc32(text.encode("utf-8"))).random(DIM) for text in texts])
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype("float32")
+
+
+def _record(record_id, text, solution="Registered"):
+    return {
+        "id": record_id,
+        "text": text,
+        "department": "water",
+        "solution": solution,
+        "location": "Ward 5",
+        "resolution_days": 3,
+    }
+
+
+@pytest.fixture
+def ai_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "embed_documents", _embed)
+    monkeypatch.setattr(faiss_index, "embed_documents", _embed)
+    monkeypatch.setattr(faiss_index, "INDEX_FILE", tmp_path / "grievance.index")
+    monkeypatch.setattr(state, "get_embedding_store", lambda: None)
+    records = [_record("CASE-1", "street light broken", "Fixed by the electricity board")]
+    store = RecordStore.create(tmp_path / "store", records)
+    index = faiss.IndexFlatIP(DIM)
+    index.add(_embed([record["text"] for record in records]))
+    ai_state = state.AIState(index=index, records=store)
+    yield ai_state
+    ai_state.close()
+
+
+def test_resolve_immediately_after_filing(ai_state):
+    filed = _record("CIV-1", "water pipe leaking near school")
+    ai_state.ingest(filed)
+    # The ingest batch has not landed yet; the update has to wait for it rather than miss.
+    assert ai_state.update_record("CIV-1", solution="Pipe replaced")
+    position = ai_state.live_index.id_map["CIV-1"]
+    assert ai_state.records[position]["solution"] == "Pipe replaced"
+    assert ai_state.live_index.index.ntotal == 2
+
+
+def test_update_of_unknown_record_misses(ai_state):
+    assert not ai_state.update_record("CIV-404", solution="Pipe replaced")
@@ -3,10 +3,28 @@ import { getHistory } from '../services/api'
 
 export default function ComplaintHistoryPage() {
   const [items, setItems] = useState([])
+  const [cursor, setCursor] = useState(null)
+
+  // /history is paged; the next page's cursor comes back in the X-Next-Cursor header.
+  const load = (after) =>
+    getHistory(1, after)
+      .then(({ data, headers }) => {
+        setItems((prev) => (after ? [...prev, ...data] : data))
+        setCursor(headers['x-next-cursor'] || null)
+      })
+      .catch(() => {
+        if (!after) setItems([])
+        setCursor(null)
+      })
 
   useEffect(() => {
-    getHistory(1).then(({ data }) => setItems(data)).catch(() => setItems([]))
+    load(null)
   }, [])
 
-  return <div className="glass p-6 text-white space-y-2">{items.map((x, i) => <div key={i} className="p-3 bg-white/10 rounded-xl">{x.query}</div>)}</div>
+  return (
+    <div className="glass p-6 text-white space-y-2">
+      {items.map((x, i) => <div key={i} className="p-3 bg-white/10 rounded-xl">{x.query}</div>)}
+      {cursor && <button onClick={() => load(cursor)} className="px-4 py-2 rounded-xl bg-cyan-500">Load more</button>}
+    </div>
+  )
 }
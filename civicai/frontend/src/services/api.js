@@ -9,7 +9,7 @@ export const register = (payload) => api.post('/auth/register', payload)
 export const chat = (payload) => api.post('/chat', payload)
 export const createComplaint = (payload) => api.post('/complaint', payload)
 export const getStatus = (ticketId) => api.get(`/status/${ticketId}`)
-export const getHistory = (userId) => api.get(`/history/${userId}`)
+export const getHistory = (userId, cursor) => api.get(`/history/${userId}`, { params: cursor ? { cursor } : {} })
 export const getAnalytics = () => api.get('/analytics')
 export const getTopics = () => api.get('/topics')
 export const getAlerts = () => api.get('/alerts')